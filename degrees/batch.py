@@ -0,0 +1,142 @@
+import csv
+import json
+import multiprocessing
+import sys
+
+from graph import TreeCache, load_graph
+
+# Graph and parent tree cache shared by the batch workers. They are
+# loaded before the pool starts, so forked workers inherit them without
+# copying or re-parsing the data.
+graph = None
+trees = None
+
+
+def main():
+    if len(sys.argv) > 5:
+        sys.exit("Usage: python batch.py "
+                 "[directory] [queries] [processes] [hubs]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    queries = sys.argv[2] if len(sys.argv) > 2 else "-"
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    hubs = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+    if queries == "-":
+        run(directory, sys.stdin, sys.stdout, processes, hubs)
+    else:
+        with open(queries, encoding="utf-8") as f:
+            run(directory, f, sys.stdout, processes, hubs)
+
+
+def run(directory, lines, output, processes=1, hubs=0):
+    """
+    Answers every `name1,name2` query in `lines`, writing one JSON
+    object per query to `output` in input order.
+    With more than one process, queries are spread over a worker pool
+    that shares the loaded graph.
+    Parent trees for the `hubs` most connected people are computed up
+    front, so queries involving them are answered without a search.
+    """
+    init_worker(directory)
+    if hubs:
+        trees.precompute(graph.most_connected(hubs))
+    pairs = read_pairs(lines)
+
+    if processes <= 1:
+        results = map(answer, pairs)
+        for result in results:
+            write(output, result)
+        return
+
+    # Prefer fork so workers share the parent's graph copy-on-write;
+    # elsewhere each worker loads it (from the snapshot) once
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context(
+        "fork" if "fork" in methods else None
+    )
+    with context.Pool(processes, init_worker, (directory,)) as pool:
+        for result in pool.imap(answer, pairs, chunksize=64):
+            write(output, result)
+
+
+def init_worker(directory):
+    """
+    Loads the graph for `directory` unless it is already loaded.
+    """
+    global graph, trees
+    if graph is None:
+        graph = load_graph(directory)
+        trees = TreeCache(graph)
+
+
+def read_pairs(lines):
+    """
+    Yields (name1, name2) pairs from CSV formatted `lines`,
+    skipping blank lines.
+    """
+    for row in csv.reader(lines):
+        if not row or not "".join(row).strip():
+            continue
+        if len(row) != 2:
+            yield (",".join(row), None)
+        else:
+            yield (row[0].strip(), row[1].strip())
+
+
+def answer(pair):
+    """
+    Returns a JSON-serializable result for a single (name1, name2) query.
+    """
+    source_name, target_name = pair
+    result = {"source": source_name, "target": target_name}
+    if target_name is None:
+        result["error"] = "expected two comma separated names"
+        return result
+
+    ids = []
+    for side, name in (("source", source_name), ("target", target_name)):
+        kind, matches = graph.name_index().match(name)
+        if len(matches) == 0:
+            result["error"] = f"person not found: {name}"
+            return result
+        elif len(matches) > 1:
+            result["error"] = f"ambiguous name: {name}"
+            result["candidates"] = [
+                graph.person_ids[person] for person in matches
+            ]
+            return result
+
+        # Say who the name resolved to, and how, since fuzzy and prefix
+        # matches may not be the person the query meant
+        person = matches[0]
+        result[f"{side}_id"] = graph.person_ids[person]
+        result[f"{side}_person"] = graph.person_names[person]
+        result[f"{side}_match"] = kind
+        ids.append(person)
+
+    steps = trees.search(ids[0], ids[1], build=False)
+    if steps is None:
+        result["degrees"] = None
+        result["path"] = None
+        return result
+
+    result["degrees"] = len(steps)
+    result["path"] = [
+        {
+            "movie_id": graph.movie_ids[movie],
+            "movie": graph.movie_titles[movie],
+            "person_id": graph.person_ids[person],
+            "person": graph.person_names[person]
+        }
+        for movie, person in steps
+    ]
+    return result
+
+
+def write(output, result):
+    output.write(json.dumps(result) + "\n")
+    output.flush()
+
+
+if __name__ == "__main__":
+    main()
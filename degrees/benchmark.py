@@ -0,0 +1,147 @@
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+
+from graph import Graph, build_csr, load_graph
+from search import STRATEGIES
+
+# Size of the synthetic graph: people, movies and stars per movie
+SYNTHETIC_PEOPLE = 200000
+SYNTHETIC_MOVIES = 60000
+SYNTHETIC_CAST = 6
+
+# Query pairs and seed used for every run, so results are comparable
+QUERIES = 20
+SEED = 50
+
+# Tracing memory slows searches down a lot, so only the first few
+# queries are repeated under tracemalloc
+MEMORY_QUERIES = 5
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [directory] [queries]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "small"
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else QUERIES
+
+    graphs = [
+        (directory, load_graph(directory)),
+        ("synthetic", synthetic_graph(
+            SYNTHETIC_PEOPLE, SYNTHETIC_MOVIES, SYNTHETIC_CAST, SEED
+        ))
+    ]
+    for name, graph in graphs:
+        pairs = query_pairs(graph, queries, SEED)
+        print(f"{name}: {len(graph)} people, {len(graph.movie_ids)} movies, "
+              f"{len(pairs)} queries")
+        print(f"{'strategy':<15}{'expanded':>12}{'seconds':>10}"
+              f"{'peak KiB':>12}  lengths")
+        reference = None
+        for strategy, result in benchmark(graph, pairs):
+            if reference is None:
+                reference = result["lengths"]
+            agree = "ok" if result["lengths"] == reference else "MISMATCH"
+            print(f"{strategy:<15}{result['expanded']:>12}"
+                  f"{result['seconds']:>10.3f}"
+                  f"{result['peak'] / 1024:>12.0f}  {agree}")
+        print()
+
+
+def strategies(graph):
+    """
+    Returns (name, search) pairs for every strategy over `graph`, where
+    `search(source, target, stats)` takes person indices.
+    """
+    def generic(strategy):
+        return lambda source, target, stats: strategy(
+            graph.neighbors, source, target, graph.degree, stats
+        )
+
+    pairs = [("csr", graph.search)]
+    pairs.extend(
+        (name, generic(strategy)) for name, strategy in STRATEGIES.items()
+    )
+    return pairs
+
+
+def benchmark(graph, pairs):
+    """
+    Runs every strategy over the query `pairs` of person indices.
+    Yields (strategy, result) pairs, where `result` holds the people
+    expanded, wall time in seconds, peak traced memory in bytes and
+    the list of path lengths found.
+    """
+    for name, search in strategies(graph):
+
+        # Time without tracing, which would slow the search down
+        stats = {}
+        lengths = []
+        start = time.perf_counter()
+        for source, target in pairs:
+            path = search(source, target, stats)
+            lengths.append(None if path is None else len(path))
+        seconds = time.perf_counter() - start
+
+        # Measure the peak memory of a single search
+        peak = 0
+        for source, target in pairs[:MEMORY_QUERIES]:
+            tracemalloc.start()
+            search(source, target, None)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        yield name, {
+            "expanded": stats.get("expanded", 0),
+            "seconds": seconds,
+            "peak": peak,
+            "lengths": lengths
+        }
+
+
+def query_pairs(graph, n, seed):
+    """
+    Returns `n` pairs of distinct person indices chosen with `seed`
+    among people who starred in at least one movie.
+    """
+    rng = random.Random(seed)
+    people = [
+        person for person in range(len(graph))
+        if graph.person_offsets[person + 1] > graph.person_offsets[person]
+    ]
+    if len(people) < 2:
+        return []
+    return [tuple(rng.sample(people, 2)) for _ in range(n)]
+
+
+def synthetic_graph(people, movies, cast, seed):
+    """
+    Returns a random `Graph` of `people` and `movies` with `cast` stars
+    per movie. Stars are drawn with a skew towards low indices, so a few
+    people appear in many movies, much like the real dataset.
+    """
+    rng = random.Random(seed)
+    star_people = array("l")
+    star_movies = array("l")
+    for movie in range(movies):
+        for person in {int(people * rng.random() ** 3) for _ in range(cast)}:
+            star_people.append(person)
+            star_movies.append(movie)
+
+    person_offsets, person_movies, _ = build_csr(
+        people, star_people, star_movies
+    )
+    movie_offsets, movie_people, _ = build_csr(
+        movies, star_movies, star_people
+    )
+    return Graph(
+        [(str(i), f"Person {i}", "") for i in range(people)],
+        [(str(i), f"Movie {i}", str(1950 + i % 70)) for i in range(movies)],
+        person_offsets, person_movies, movie_offsets, movie_people
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
-import csv
+import gc
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import load_graph
+from ingest import LoadStats, read_rows
+from nameindex import NameIndex
+from search import STRATEGIES
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,44 +15,114 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Prefix and fuzzy index over people's names, built on first use
+name_index = None
 
-def load_data(directory):
+
+def load_data(directory, cache=True, stats=None):
     """
     Load data from CSV files into memory.
+
+    If `cache` is true, the data is filled in from the compact graph
+    snapshot of `graph.load_graph`, which is kept next to the CSV files
+    and reused until any of them change.
+    If `stats` is a `LoadStats`, per-phase row counts and timings
+    are recorded in it.
     """
+    if stats is None:
+        stats = LoadStats()
+
+    # Any previously built name index no longer covers everyone
+    global name_index
+    name_index = None
+
+    if cache:
+        graph = load_graph(directory, stats=stats)
+        with stats.phase("dicts"):
+            fill_from_graph(graph)
+        return
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
+    with stats.phase("people"):
+        for person_id, name, birth in read_rows(
+            f"{directory}/people.csv", ("id", "name", "birth"),
+            stats, "people", intern=("id",)
+        ):
+            people[person_id] = {
+                "name": name,
+                "birth": birth,
                 "movies": set()
             }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
+            if name.lower() not in names:
+                names[name.lower()] = {person_id}
             else:
-                names[row["name"].lower()].add(row["id"])
+                names[name.lower()].add(person_id)
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
+    with stats.phase("movies"):
+        for movie_id, title, year in read_rows(
+            f"{directory}/movies.csv", ("id", "title", "year"),
+            stats, "movies", intern=("id",)
+        ):
+            movies[movie_id] = {
+                "title": title,
+                "year": year,
                 "stars": set()
             }
 
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    # Load stars, counting rows that refer to unknown people or movies
+    with stats.phase("stars"):
+        for person_id, movie_id in read_rows(
+            f"{directory}/stars.csv", ("person_id", "movie_id"),
+            stats, "stars", intern=("person_id", "movie_id")
+        ):
+            if person_id not in people or movie_id not in movies:
+                stats.dangling += 1
+                continue
+            if movie_id in people[person_id]["movies"]:
+                stats.duplicates += 1
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+
+
+def fill_from_graph(graph):
+    """
+    Fills `names`, `people` and `movies` from a compact `Graph`.
+    """
+    person_ids = graph.person_ids
+    movie_ids = graph.movie_ids
+
+    # Only new containers are created here, none become garbage, so
+    # collecting while millions of them are built would be wasted work
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for person, (person_id, name, birth) in enumerate(zip(
+            person_ids, graph.person_names, graph.person_births
+        )):
+            people[person_id] = {
+                "name": name,
+                "birth": birth,
+                "movies": {movie_ids[movie]
+                           for movie in graph.movies_for(person)}
+            }
+            if name.lower() not in names:
+                names[name.lower()] = {person_id}
+            else:
+                names[name.lower()].add(person_id)
+
+        for movie, (movie_id, title, year) in enumerate(zip(
+            movie_ids, graph.movie_titles, graph.movie_years
+        )):
+            movies[movie_id] = {
+                "title": title,
+                "year": year,
+                "stars": {person_ids[person]
+                          for person in graph.stars_for(movie)}
+            }
+    finally:
+        if enabled:
+            gc.enable()
 
 
 def main():  # check the lenght of the arguments
@@ -57,19 +130,20 @@ def main():  # check the lenght of the arguments
         sys.exit("Usage: python degrees.py [directory]")
     directory = sys.argv[1] if len(sys.argv) == 2 else "large"
 
-    # Load data from files into memory
+    # Load the compact graph, which starts much faster from its snapshot
+    # than filling in the people and movies dicts
     print("Loading data...")
-    load_data(directory)
+    graph = load_graph(directory)
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    source = person_for_name(graph, input("Name: "))
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_for_name(graph, input("Name: "))
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = graph.search(source, target)
 
     if path is None:
         print("Not connectnected.")
@@ -78,54 +152,26 @@ def main():  # check the lenght of the arguments
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = graph.person_names[path[i][1]]
+            person2 = graph.person_names[path[i + 1][1]]
+            movie = graph.movie_titles[path[i + 1][0]]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
-def shortest_path(source, target):
+def shortest_path(source, target, strategy="bidirectional"):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
     If no possible path, returns None.
-    """
-    # Initialize frontier and add "source" as the first node
-    start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
-    frontier.add(start)
-
-    # Initialize an empty explored set
-    explored = set()
-
-    # Keep looping until solution found
-    while True:
-
-        # If frontier is empty, then no path
-        if frontier.empty():
-            return None
-
-        # Choose a node from the frontier
-        node = frontier.remove()
-
-        # Mark node as explored
-        explored.add(node.state)
 
-        # Add neighbors to frontier
-        for action, state in neighbors_for_person(node.state):
-            if not frontier.contains_state(state) and state not in explored:
-                child = Node(state=state, parent=node, action=action)
+    `strategy` names one of `search.STRATEGIES`: by default the search
+    grows from both ends and meets in the middle; "bfs" is the plain
+    breadth-first search and "astar" prefers well connected people.
+    """
+    return STRATEGIES[strategy](
+        neighbors_for_person, source, target, degree_for_person
+    )
 
-                # If child is the goal, then we have a solution
-                if child.state == target:
-                    path = []
-                    while child.parent is not None:
-                        path.insert(0, (child.action, child.state))
-                        child = child.parent
 
-                    return path
-                else:
-                    frontier.add(child)
-    
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -151,6 +197,54 @@ def person_id_for_name(name):
     else:
         return person_ids[0]
 
+def person_for_name(graph, name):
+    """
+    Same as `person_id_for_name`, but over a compact `Graph`: returns
+    the person index for a person's name, resolving ambiguities as
+    needed.
+    """
+    persons = graph.people_named(name)
+    if len(persons) == 0:
+        return None
+    elif len(persons) > 1:
+        print(f"Which '{name}'?")
+        for person in persons:
+            person_id = graph.person_ids[person]
+            name = graph.person_names[person]
+            birth = graph.person_births[person]
+            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+        try:
+            person = graph.person_index.get(input("Intended Person ID: "))
+            if person in persons:
+                return person
+        except ValueError:
+            pass
+        return None
+    else:
+        return persons[0]
+
+def resolve_name(name, max_distance=2):
+    """
+    Returns the list of IMDB ids that `name` may refer to, without
+    prompting: exact matches first, then names starting with `name`,
+    then the closest names within `max_distance` edits.
+    """
+    global name_index
+    if name_index is None:
+        name_index = NameIndex(
+            (person["name"], person_id)
+            for person_id, person in people.items()
+        )
+    return name_index.resolve(name, max_distance)
+
+
+def degree_for_person(person_id):
+    """
+    Returns the number of movies a given person starred in.
+    """
+    return len(people[person_id]["movies"])
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
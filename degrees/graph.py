@@ -0,0 +1,583 @@
+import heapq
+from array import array
+from collections import OrderedDict
+
+from ingest import LoadStats, read_rows
+from nameindex import NameIndex
+from snapshot import load_snapshot, save_snapshot
+
+
+class Graph():
+    """
+    Compact bipartite graph of people and the movies they starred in.
+
+    People and movies are numbered densely from 0 and their links are kept
+    in CSR form: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the stars
+    of movie `m` are `movie_people[movie_offsets[m]:movie_offsets[m + 1]]`.
+    """
+
+    def __init__(self, people, movies, person_offsets, person_movies,
+                 movie_offsets, movie_people):
+        """
+        `people` is a list of (id, name, birth) rows and `movies`
+        a list of (id, title, year) rows, both in index order.
+        """
+        self.person_ids = [row[0] for row in people]
+        self.person_names = [row[1] for row in people]
+        self.person_births = [row[2] for row in people]
+        self.movie_ids = [row[0] for row in movies]
+        self.movie_titles = [row[1] for row in movies]
+        self.movie_years = [row[2] for row in movies]
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.person_index = {
+            person_id: i for i, person_id in enumerate(self.person_ids)
+        }
+
+        # Index of person names to person indices, built on first use
+        self.index = None
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    def name_index(self):
+        """
+        Returns a `NameIndex` mapping person names to person indices.
+        """
+        if self.index is None:
+            self.index = NameIndex(
+                (name, i) for i, name in enumerate(self.person_names)
+            )
+        return self.index
+
+    def people_named(self, name):
+        """
+        Returns the list of person indices whose name is `name`,
+        ignoring case.
+
+        Until the name index has been built, the names are scanned
+        instead, which is much faster than building it for a lookup or
+        two.
+        """
+        if self.index is None:
+            name = name.lower()
+            return [person for person, other in enumerate(self.person_names)
+                    if other.lower() == name]
+        return self.name_index().exact(name)
+
+    def movies_for(self, person):
+        """
+        Returns the movie indices person `person` starred in.
+        """
+        return self.person_movies[
+            self.person_offsets[person]:self.person_offsets[person + 1]
+        ]
+
+    def stars_for(self, movie):
+        """
+        Returns the person indices who starred in movie `movie`.
+        """
+        return self.movie_people[
+            self.movie_offsets[movie]:self.movie_offsets[movie + 1]
+        ]
+
+    def degree(self, person):
+        """
+        Returns the number of (movie, person) links leaving `person`,
+        counting each co-star once per shared movie.
+        """
+        return sum(
+            self.movie_offsets[movie + 1] - self.movie_offsets[movie]
+            for movie in self.movies_for(person)
+        )
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with a given person.
+        """
+        for movie in self.movies_for(person):
+            for star in self.stars_for(movie):
+                yield movie, star
+
+    def shortest_path(self, source, target):
+        """
+        Same as `degrees.shortest_path`, but over the compact graph:
+        takes IMDB person ids and returns a list of
+        (movie_id, person_id) pairs, or None if not connected.
+        """
+        steps = self.search(
+            self.person_index[source], self.person_index[target]
+        )
+        if steps is None:
+            return None
+        return [
+            (self.movie_ids[movie], self.person_ids[person])
+            for movie, person in steps
+        ]
+
+    def search(self, source, target, stats=None):
+        """
+        Bidirectional breadth-first search between two person indices.
+        Returns a list of (movie, person) index pairs, or None.
+        If `stats` is a dict, the number of people expanded is added to
+        `stats["expanded"]`.
+
+        Visited people are tracked in dicts and expanded movies in sets,
+        so a search costs time and memory proportional to the part of
+        the graph it explores, not to the size of the graph; the CSR
+        arrays are only read for adjacency. A movie only needs expanding
+        once per direction: every star it leads to is reached at the
+        same depth the first time.
+        """
+        if source == target:
+            return []
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+
+        # For each direction: the person and movie one step closer to
+        # the root of that search for every person reached, and the
+        # movies expanded
+        forward = ({source: source}, {}, set())
+        backward = ({target: target}, {}, set())
+        forward_frontier = [source]
+        backward_frontier = [target]
+
+        while forward_frontier and backward_frontier:
+
+            # Always grow the smaller frontier
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, side, other = forward_frontier, forward, backward
+            else:
+                frontier, side, other = backward_frontier, backward, forward
+            parent, via, expanded = side
+            other_parent = other[0]
+
+            # Expand the whole level, remembering the best meeting point
+            layer = []
+            meeting = -1
+            best = -1
+            if stats is not None:
+                stats["expanded"] = stats.get("expanded", 0) + len(frontier)
+            for person in frontier:
+                for movie in person_movies[person_offsets[person]:
+                                           person_offsets[person + 1]]:
+                    if movie in expanded:
+                        continue
+                    expanded.add(movie)
+                    for star in movie_people[movie_offsets[movie]:
+                                             movie_offsets[movie + 1]]:
+                        if star in parent:
+                            continue
+                        parent[star] = person
+                        via[star] = movie
+                        layer.append(star)
+                        if star in other_parent:
+                            length = (self.depth(forward[0], star)
+                                      + self.depth(backward[0], star))
+                            if best == -1 or length < best:
+                                meeting, best = star, length
+
+            if meeting != -1:
+                return self.join(forward, backward, meeting)
+
+            if side is forward:
+                forward_frontier = layer
+            else:
+                backward_frontier = layer
+
+        return None
+
+    def most_connected(self, n):
+        """
+        Returns the indices of the `n` people with the highest degree.
+        """
+        return heapq.nlargest(n, range(len(self.person_ids)), key=self.degree)
+
+    def parent_tree(self, source):
+        """
+        Runs a full breadth-first search from person index `source`.
+        Returns (parent, via) arrays giving, for every person, the person
+        and movie one step closer to `source` (-1 if unreachable).
+        """
+        parent = array("l", [-1]) * len(self.person_ids)
+        via = array("l", [-1]) * len(self.person_ids)
+        expanded = bytearray(len(self.movie_ids))
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+
+        parent[source] = source
+        frontier = [source]
+        while frontier:
+            layer = []
+            for person in frontier:
+                for i in range(person_offsets[person],
+                               person_offsets[person + 1]):
+                    movie = person_movies[i]
+                    if expanded[movie]:
+                        continue
+                    expanded[movie] = 1
+                    for j in range(movie_offsets[movie],
+                                   movie_offsets[movie + 1]):
+                        star = movie_people[j]
+                        if parent[star] == -1:
+                            parent[star] = person
+                            via[star] = movie
+                            layer.append(star)
+            frontier = layer
+        return parent, via
+
+    def movies_between(self, min_year=None, max_year=None):
+        """
+        Returns a bytearray flagging the movies released between
+        `min_year` and `max_year` inclusive, or None if neither is set.
+        Movies without a valid year are excluded by any filter.
+        """
+        if min_year is None and max_year is None:
+            return None
+        allowed = bytearray(len(self.movie_ids))
+        for movie, year in enumerate(self.movie_years):
+            try:
+                year = int(year)
+            except ValueError:
+                continue
+            if ((min_year is None or year >= min_year)
+                    and (max_year is None or year <= max_year)):
+                allowed[movie] = 1
+        return allowed
+
+    def distances(self, root, allowed=None):
+        """
+        Returns an array of the number of steps from every person to
+        person index `root` (-1 if unreachable), only following movies
+        flagged in `allowed` when it is given.
+        """
+        distance = array("l", [-1]) * len(self.person_ids)
+        expanded = bytearray(len(self.movie_ids))
+        distance[root] = 0
+        frontier = [root]
+        steps = 0
+        while frontier:
+            steps += 1
+            layer = []
+            for person in frontier:
+                for movie in self.movies_for(person):
+                    if expanded[movie] or (allowed is not None
+                                           and not allowed[movie]):
+                        continue
+                    expanded[movie] = 1
+                    for star in self.stars_for(movie):
+                        if distance[star] == -1:
+                            distance[star] = steps
+                            layer.append(star)
+            frontier = layer
+        return distance
+
+    def paths(self, source, target, min_year=None, max_year=None,
+              max_length=None):
+        """
+        Lazily yields the simple paths between person indices `source`
+        and `target` as lists of (movie, person) index pairs, in order
+        of length. Paths through different movies count as different.
+        Only movies released between `min_year` and `max_year` are used,
+        and paths longer than `max_length` steps are not generated.
+
+        Paths of each length are found by a depth-first search that only
+        steps to people close enough to the target to finish in time, so
+        memory stays proportional to the graph plus one path.
+        Use `itertools.islice` for the k shortest paths.
+        """
+        if source == target:
+            yield []
+            return
+
+        allowed = self.movies_between(min_year, max_year)
+        distance = self.distances(target, allowed)
+        if distance[source] == -1:
+            return
+        if max_length is None:
+            max_length = len(self.person_ids) - 1
+
+        for length in range(distance[source], max_length + 1):
+            yield from self.extend(
+                source, target, length, distance, allowed, [], {source}
+            )
+
+    def shortest_paths(self, source, target, min_year=None, max_year=None):
+        """
+        Lazily yields every shortest path between person indices
+        `source` and `target`, in the same format as `paths`.
+        """
+        allowed = self.movies_between(min_year, max_year)
+        length = self.distances(target, allowed)[source]
+        if length == -1:
+            return
+        yield from self.paths(source, target, min_year, max_year, length)
+
+    def extend(self, person, target, remaining, distance, allowed,
+               path, on_path):
+        """
+        Yields the ways to extend `path`, which ends at `person`, by
+        exactly `remaining` steps to `target` without revisiting anyone
+        in `on_path`.
+        """
+        if remaining == 0:
+            if person == target:
+                yield list(path)
+            return
+
+        for movie in self.movies_for(person):
+            if allowed is not None and not allowed[movie]:
+                continue
+            for star in self.stars_for(movie):
+                steps = distance[star]
+                if steps == -1 or steps >= remaining or star in on_path:
+                    continue
+                path.append((movie, star))
+                on_path.add(star)
+                yield from self.extend(star, target, remaining - 1,
+                                       distance, allowed, path, on_path)
+                path.pop()
+                on_path.discard(star)
+
+    @staticmethod
+    def depth(parent, person):
+        """
+        Returns the number of steps from `person` to the root of `parent`.
+        """
+        length = 0
+        while parent[person] != person:
+            person = parent[person]
+            length += 1
+        return length
+
+    @staticmethod
+    def join(forward, backward, meeting):
+        """
+        Joins the two halves of a bidirectional search at `meeting`
+        into a list of (movie, person) pairs from source to target.
+        """
+        path = []
+        parent, via = forward[0], forward[1]
+        person = meeting
+        while parent[person] != person:
+            path.append((via[person], person))
+            person = parent[person]
+        path.reverse()
+
+        parent, via = backward[0], backward[1]
+        person = meeting
+        while parent[person] != person:
+            path.append((via[person], parent[person]))
+            person = parent[person]
+        return path
+
+
+class TreeCache():
+    """
+    LRU cache of single-source parent trees over a `Graph`.
+
+    Once the tree for a source is cached, the path to any target from
+    that source (or, since the graph is undirected, from any person to
+    that source) takes time proportional to its length.
+    Trees are evicted least recently used first to keep the cache under
+    `max_bytes`.
+    """
+
+    def __init__(self, graph, max_bytes=256 * 1024 * 1024):
+        self.graph = graph
+        self.max_bytes = max_bytes
+        self.trees = OrderedDict()
+
+    def tree_bytes(self):
+        """
+        Returns the memory used by a single cached tree, in bytes.
+        """
+        return 2 * array("l").itemsize * len(self.graph)
+
+    def capacity(self):
+        """
+        Returns the number of trees that fit in the cache.
+        """
+        return self.max_bytes // max(self.tree_bytes(), 1)
+
+    def __contains__(self, source):
+        return source in self.trees
+
+    def tree(self, source, build=True):
+        """
+        Returns the (parent, via) tree for person index `source`,
+        computing and caching it if needed and `build` is true.
+        Returns None if the tree is not cached and `build` is false.
+        """
+        if source in self.trees:
+            self.trees.move_to_end(source)
+            return self.trees[source]
+        if not build or self.capacity() == 0:
+            return None
+
+        tree = self.graph.parent_tree(source)
+        self.trees[source] = tree
+        while len(self.trees) > self.capacity():
+            self.trees.popitem(last=False)
+        return tree
+
+    def precompute(self, sources):
+        """
+        Builds and caches the trees for every index in `sources`,
+        as far as they fit.
+        """
+        for source in list(sources)[:self.capacity()]:
+            self.tree(source)
+
+    def search(self, source, target, build=True):
+        """
+        Same as `Graph.search`, answered from the tree of `source`
+        or `target`. If neither is cached, the tree of `target` is built
+        when `build` is true; otherwise falls back to `Graph.search`.
+        """
+        if source == target:
+            return []
+
+        tree = self.tree(source, build=False)
+        if tree is not None:
+            steps = self.walk(tree, target)
+            if steps is not None:
+                steps.reverse()
+                return [
+                    (movie, person) for person, movie, _ in steps
+                ]
+            return None
+
+        tree = self.tree(target, build=build)
+        if tree is None:
+            return self.graph.search(source, target)
+        steps = self.walk(tree, source)
+        if steps is None:
+            return None
+        return [(movie, parent) for _, movie, parent in steps]
+
+    @staticmethod
+    def walk(tree, person):
+        """
+        Returns the (person, movie, parent) steps from `person` up to
+        the root of `tree`, or None if `person` is unreachable.
+        """
+        parent, via = tree
+        if parent[person] == -1:
+            return None
+        steps = []
+        while parent[person] != person:
+            steps.append((person, via[person], parent[person]))
+            person = parent[person]
+        return steps
+
+
+def build_csr(count, rows, columns):
+    """
+    Groups the (rows[k], columns[k]) links into CSR offset and index
+    arrays over `count` rows, dropping repeated links.
+    Returns (offsets, indices, duplicates).
+    """
+    offsets = array("l", [0]) * (count + 1)
+    for row in rows:
+        offsets[row + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    indices = array("l", [0]) * len(rows)
+    cursor = offsets[:-1]
+    for row, column in zip(rows, columns):
+        indices[cursor[row]] = column
+        cursor[row] += 1
+
+    # Sort each row and squeeze out repeated links in place
+    end = 0
+    for i in range(count):
+        start = end
+        unique = sorted(set(indices[offsets[i]:offsets[i + 1]]))
+        end = start + len(unique)
+        indices[start:end] = array("l", unique)
+        offsets[i] = start
+    offsets[count] = end
+    duplicates = len(indices) - end
+    del indices[end:]
+    return offsets, indices, duplicates
+
+
+def load_graph(directory, cache=True, stats=None):
+    """
+    Load data from CSV files into a compact `Graph`.
+
+    If `cache` is true, the graph is snapshotted next to the CSV files
+    and reused until any of them change.
+    If `stats` is a `LoadStats`, per-phase row counts and timings
+    are recorded in it.
+    """
+    if stats is None:
+        stats = LoadStats()
+
+    if cache:
+        with stats.phase("snapshot"):
+            graph = load_snapshot(directory, "graph")
+        if graph is not None:
+            stats.snapshot = True
+            return graph
+
+    # Load people
+    with stats.phase("people"):
+        people = list(read_rows(
+            f"{directory}/people.csv", ("id", "name", "birth"),
+            stats, "people", intern=("id",)
+        ))
+        person_index = {row[0]: i for i, row in enumerate(people)}
+
+    # Load movies
+    with stats.phase("movies"):
+        movies = list(read_rows(
+            f"{directory}/movies.csv", ("id", "title", "year"),
+            stats, "movies", intern=("id",)
+        ))
+        movie_index = {row[0]: i for i, row in enumerate(movies)}
+
+    # Stream stars into two flat columns, counting rows that refer to
+    # unknown people or movies
+    star_people = array("l")
+    star_movies = array("l")
+    with stats.phase("stars"):
+        for person_id, movie_id in read_rows(
+            f"{directory}/stars.csv", ("person_id", "movie_id"),
+            stats, "stars"
+        ):
+            person = person_index.get(person_id)
+            movie = movie_index.get(movie_id)
+            if person is None or movie is None:
+                stats.dangling += 1
+                continue
+            star_people.append(person)
+            star_movies.append(movie)
+
+    with stats.phase("index"):
+        person_offsets, person_movies, duplicates = build_csr(
+            len(people), star_people, star_movies
+        )
+        movie_offsets, movie_people, _ = build_csr(
+            len(movies), star_movies, star_people
+        )
+        stats.duplicates += duplicates
+        del star_people, star_movies
+        graph = Graph(people, movies, person_offsets, person_movies,
+                      movie_offsets, movie_people)
+
+    if cache:
+        with stats.phase("snapshot"):
+            save_snapshot(directory, "graph", graph)
+    return graph
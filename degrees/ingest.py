@@ -0,0 +1,125 @@
+import csv
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Report progress every this many rows
+PROGRESS_INTERVAL = 100000
+
+
+class LoadStats():
+    """
+    Per-phase row counters and timings collected while loading a dataset.
+
+    `progress`, if given, is called as `progress(phase, rows)` every
+    `PROGRESS_INTERVAL` rows and once more when the phase ends.
+    """
+
+    def __init__(self, progress=None):
+        self.progress = progress
+        self.seconds = {}
+        self.rows = {}
+        self.dangling = 0
+        self.duplicates = 0
+        self.snapshot = False
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times the enclosed block as phase `name`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = (self.seconds.get(name, 0)
+                                  + time.perf_counter() - start)
+            if self.progress is not None and name in self.rows:
+                self.progress(name, self.rows[name])
+
+    def count(self, phase):
+        """
+        Counts one row read in `phase`.
+        """
+        rows = self.rows.get(phase, 0) + 1
+        self.rows[phase] = rows
+        if self.progress is not None and rows % PROGRESS_INTERVAL == 0:
+            self.progress(phase, rows)
+
+    def throughput(self, phase):
+        """
+        Returns the rows per second read in `phase`.
+        """
+        seconds = self.seconds.get(phase, 0)
+        if not seconds:
+            return 0.0
+        return self.rows.get(phase, 0) / seconds
+
+    @staticmethod
+    def peak_memory():
+        """
+        Returns the peak resident memory of this process in bytes,
+        or None where the platform does not report it.
+        """
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == "darwin" else peak * 1024
+
+    def as_dict(self):
+        """
+        Returns the collected counters as a JSON-serializable dict.
+        """
+        return {
+            "snapshot": self.snapshot,
+            "phases": {
+                phase: {
+                    "seconds": seconds,
+                    "rows": self.rows.get(phase),
+                    "rows_per_second": self.throughput(phase)
+                }
+                for phase, seconds in self.seconds.items()
+            },
+            "dangling_stars": self.dangling,
+            "duplicate_stars": self.duplicates,
+            "peak_memory": self.peak_memory()
+        }
+
+    def __str__(self):
+        lines = []
+        for phase, seconds in self.seconds.items():
+            rows = self.rows.get(phase)
+            if rows is None:
+                lines.append(f"{phase}: {seconds:.3f}s")
+            else:
+                lines.append(f"{phase}: {rows} rows in {seconds:.3f}s "
+                             f"({self.throughput(phase):.0f} rows/s)")
+        lines.append(f"dangling stars: {self.dangling}")
+        lines.append(f"duplicate stars: {self.duplicates}")
+        return "\n".join(lines)
+
+
+def read_rows(path, columns, stats, phase, intern=()):
+    """
+    Streams the `columns` of the CSV file at `path` as tuples,
+    one row at a time, counting each row in `stats` under `phase`.
+    Values of the columns listed in `intern` are interned, so the same
+    id read from several files is stored only once.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        indices = [header.index(column) for column in columns]
+        interned = [column in intern for column in columns]
+        for row in reader:
+            stats.count(phase)
+            yield tuple(
+                sys.intern(row[i]) if interned[k] else row[i]
+                for k, i in enumerate(indices)
+            )
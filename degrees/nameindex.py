@@ -0,0 +1,209 @@
+from array import array
+from bisect import bisect_left
+
+
+class NameIndex():
+    """
+    Sorted index of lowercase names supporting exact, prefix and
+    bounded edit distance lookups.
+
+    The sorted list of names doubles as an implicit trie: all names
+    sharing a prefix form a contiguous range, found by bisection, so
+    fuzzy lookups can prune whole ranges without storing trie nodes.
+
+    A name within k edits of a query has at most k // 2 edits in the
+    query's first half or at most k - 1 - k // 2 in its last half, so
+    fuzzy lookups walk the trie of names with that many edits in the
+    first half of the query, and the trie of reversed names likewise
+    for the last half. Neither walk explores the first levels of its
+    trie in full.
+    """
+
+    def __init__(self, entries):
+        """
+        `entries` is an iterable of (name, key) pairs, where `key`
+        identifies the person (an IMDB id or a graph index).
+        """
+        keys = {}
+        for name, key in entries:
+            keys.setdefault(name.lower(), []).append(key)
+        self.names = sorted(keys)
+        self.keys = [keys[name] for name in self.names]
+
+        # Reversed names, sorted, and the position of each in `names`,
+        # built on the first fuzzy lookup
+        self.reversed = None
+        self.positions = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def exact(self, name):
+        """
+        Returns the list of keys whose name is `name`, ignoring case.
+        """
+        name = name.lower()
+        i = bisect_left(self.names, name)
+        if i < len(self.names) and self.names[i] == name:
+            return self.keys[i]
+        return []
+
+    def prefix(self, prefix, limit=None):
+        """
+        Returns (name, keys) pairs for names starting with `prefix`,
+        in alphabetical order, at most `limit` of them.
+        """
+        prefix = prefix.lower()
+        lo = bisect_left(self.names, prefix)
+        hi = bisect_left(self.names, prefix + "\U0010ffff", lo)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [(self.names[i], self.keys[i]) for i in range(lo, hi)]
+
+    def fuzzy(self, name, max_distance=2, limit=None):
+        """
+        Returns (distance, name, keys) triples for names within
+        `max_distance` edits of `name`, closest first, at most
+        `limit` of them.
+        """
+        name = name.lower()
+        if not self.names:
+            return []
+        if self.reversed is None:
+            order = sorted(range(len(self.names)),
+                           key=lambda i: self.names[i][::-1])
+            self.reversed = [self.names[i][::-1] for i in order]
+            self.positions = array("l", order)
+
+        # Search the first half of `name` forwards and the last half,
+        # reversed, backwards, splitting the edits between them
+        split = len(name) // 2
+        row = [min(j, max_distance + 1) for j in range(len(name) + 1)]
+        forward = []
+        self.search(self.names, name, max_distance, max_distance // 2,
+                    split, 0, 0, len(self.names), row, forward)
+        backward = []
+        if max_distance:
+            self.search(self.reversed, name[::-1], max_distance,
+                        max_distance - 1 - max_distance // 2,
+                        len(name) - split, 0, 0, len(self.reversed), row,
+                        backward)
+
+        matches = set(forward)
+        matches.update((distance, self.positions[i])
+                       for distance, i in backward)
+        matches = sorted(matches)
+        if limit is not None:
+            matches = matches[:limit]
+        return [(distance, self.names[i], self.keys[i])
+                for distance, i in matches]
+
+    def search(self, names, name, max_distance, head, split, depth, lo, hi,
+               row, matches):
+        """
+        Collects fuzzy matches among `names[lo:hi]`, which all share
+        their first `depth` characters, that start with a prefix within
+        `head` edits of `name[:split]` (any, if `head` is None). `row` is
+        the edit distance row of `name` against the shared prefix.
+        """
+        # Until the shared prefix is within `head` edits of `name[:split]`,
+        # some prefix of `name[:split]` must stay within `head` edits of
+        # it, and it may grow at most `head` characters longer than
+        # `split`. Once it is, only `max_distance` bounds the rest.
+        if head is not None:
+            if row[split] <= head:
+                head = None
+            elif depth >= split + head or min(row[:split + 1]) > head:
+                return
+
+        # A name equal to the shared prefix sorts first in the range
+        if len(names[lo]) == depth:
+            if row[-1] <= max_distance and head is None:
+                matches.append((row[-1], lo))
+            lo += 1
+
+        if lo >= hi:
+            return
+
+        # With no edits to spare, a child stays within bounds only by
+        # matching the next character of `name` after a cell at the
+        # bound, so only those children are looked up
+        cells = row if head is None else row[:split + 1]
+        bound = max_distance if head is None else head
+        if min(cells) == bound:
+            prefix = names[lo][:depth]
+            for c in sorted({name[j] for j in range(len(cells) - 1)
+                             if cells[j] == bound}):
+                start = bisect_left(names, prefix + c, lo, hi)
+                end = bisect_left(names, prefix + chr(ord(c) + 1), start, hi)
+                if start < end:
+                    child = self.step(name, max_distance, depth + 1, c, row)
+                    self.search(names, name, max_distance, head, split,
+                                depth + 1, start, end, child, matches)
+            return
+
+        # Otherwise visit each child range, one per distinct next character
+        while lo < hi:
+            prefix = names[lo][:depth + 1]
+            c = prefix[-1]
+            end = bisect_left(names, prefix[:-1] + chr(ord(c) + 1), lo, hi)
+            child = self.step(name, max_distance, depth + 1, c, row)
+            if min(child) <= max_distance:
+                self.search(names, name, max_distance, head, split,
+                            depth + 1, lo, end, child, matches)
+            lo = end
+
+    @staticmethod
+    def step(name, max_distance, depth, c, row):
+        """
+        Returns the edit distance row of `name` against a prefix of
+        length `depth` ending in `c`, given the row for the prefix
+        without `c`. Only cells within `max_distance` of the diagonal
+        can stay within bounds, so the rest are capped without being
+        computed.
+        """
+        cap = max_distance + 1
+        child = [cap] * len(row)
+        if depth <= max_distance:
+            child[0] = depth
+        start = max(1, depth - max_distance)
+        stop = min(len(row), depth + max_distance + 1)
+        for j in range(start, stop):
+            child[j] = min(child[j - 1] + 1, row[j] + 1,
+                           row[j - 1] + (name[j - 1] != c), cap)
+        return child
+
+    def resolve(self, name, max_distance=2):
+        """
+        Returns the candidate keys for `name` without prompting:
+        the exact matches if there are any, otherwise the names starting
+        with `name`, otherwise the fuzzy matches at the smallest edit
+        distance. An empty list means nothing matched.
+        """
+        return self.match(name, max_distance)[1]
+
+    def match(self, name, max_distance=2):
+        """
+        Like `resolve`, but returns a (kind, keys) pair where `kind` is
+        "exact", "fuzzy" or "prefix" depending on how the keys were
+        found, or None if nothing matched.
+        """
+        if not name.strip():
+            return None, []
+
+        keys = self.exact(name)
+        if keys:
+            return "exact", list(keys)
+
+        # Prefixes are a bisection away, so try them before the much
+        # slower fuzzy lookup
+        keys = [key for _, keys in self.prefix(name) for key in keys]
+        if keys:
+            return "prefix", keys
+
+        fuzzy = self.fuzzy(name, max_distance)
+        if fuzzy:
+            closest = fuzzy[0][0]
+            return "fuzzy", [key for distance, _, keys in fuzzy
+                             if distance == closest for key in keys]
+        return None, []
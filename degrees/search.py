@@ -0,0 +1,213 @@
+"""
+Shortest path search strategies.
+
+Every strategy takes a `neighbors(state)` function returning
+(action, state) pairs, a `source` and a `target` state, and returns the
+shortest list of (action, state) pairs leading from source to target,
+or None if there is none. `degree(state)`, if given, estimates how well
+connected a state is. If `stats` is a dict, the number of states whose
+neighbors were expanded is added to `stats["expanded"]`.
+"""
+import heapq
+import itertools
+
+from util import Node, QueueFrontier
+
+
+def breadth_first(neighbors, source, target, degree=None, stats=None):
+    """
+    Breadth-first search from `source` outwards until `target` is found.
+    """
+    if source == target:
+        return []
+
+    # Initialize frontier and add "source" as the first node
+    start = Node(state=source, parent=None, action=None)
+    frontier = QueueFrontier()
+    frontier.add(start)
+
+    # Initialize an empty explored set
+    explored = set()
+
+    # Keep looping until solution found
+    while True:
+
+        # If frontier is empty, then no path
+        if frontier.empty():
+            return None
+
+        # Choose a node from the frontier
+        node = frontier.remove()
+        count(stats)
+
+        # Mark node as explored
+        explored.add(node.state)
+
+        # Add neighbors to frontier
+        for action, state in neighbors(node.state):
+            if not frontier.contains_state(state) and state not in explored:
+                child = Node(state=state, parent=node, action=action)
+
+                # If child is the goal, then we have a solution
+                if child.state == target:
+                    path = []
+                    while child.parent is not None:
+                        path.append((child.action, child.state))
+                        child = child.parent
+                    path.reverse()
+                    return path
+                else:
+                    frontier.add(child)
+
+
+def bidirectional(neighbors, source, target, degree=None, stats=None):
+    """
+    Bidirectional breadth-first search between `source` and `target`.
+    Expands one whole level of the smaller frontier at a time and stops
+    at the first level where the two searches meet.
+    Assumes the neighbor relation is symmetric.
+    """
+    if source == target:
+        return []
+
+    # Map each reached state to the (state, action) step leading back
+    # to the source (forwards) or on towards the target (backwards)
+    forwards = {source: None}
+    backwards = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # Always grow the smaller frontier
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, parents, others = forward_frontier, forwards, backwards
+        else:
+            frontier, parents, others = backward_frontier, backwards, forwards
+
+        # Expand the whole level, remembering the best meeting point
+        layer = []
+        meeting = None
+        best = None
+        for state in frontier:
+            count(stats)
+            for action, neighbor in neighbors(state):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (state, action)
+                layer.append(neighbor)
+                if neighbor in others:
+                    length = (path_length(forwards, neighbor)
+                              + path_length(backwards, neighbor))
+                    if best is None or length < best:
+                        meeting, best = neighbor, length
+
+        if meeting is not None:
+            return join_paths(forwards, backwards, meeting)
+
+        if parents is forwards:
+            forward_frontier = layer
+        else:
+            backward_frontier = layer
+
+    return None
+
+
+def astar(neighbors, source, target, degree=None, stats=None):
+    """
+    A* search with unit step costs.
+
+    The heuristic is 0 at the target, 1 for the target's neighbors and
+    2 for everyone else, which never overestimates. Among states with
+    equal estimated cost, those with a higher `degree(state)` (if given)
+    are expanded first, as well connected states tend to reach the
+    target sooner.
+    """
+    if source == target:
+        return []
+
+    near_target = {state for _, state in neighbors(target)}
+    count(stats)
+
+    def heuristic(state):
+        if state == target:
+            return 0
+        return 1 if state in near_target else 2
+
+    # Frontier entries are (estimate, -degree, tie, state)
+    tie = itertools.count()
+    frontier = [(heuristic(source), 0, next(tie), source)]
+    parents = {source: None}
+    cost = {source: 0}
+    explored = set()
+
+    while frontier:
+        _, _, _, state = heapq.heappop(frontier)
+        if state in explored:
+            continue
+        if state == target:
+            return join_paths(parents, {target: None}, target)
+        explored.add(state)
+        count(stats)
+
+        steps = cost[state] + 1
+        for action, neighbor in neighbors(state):
+            if neighbor in explored or steps >= cost.get(neighbor, steps + 1):
+                continue
+            cost[neighbor] = steps
+            parents[neighbor] = (state, action)
+            heapq.heappush(frontier, (
+                steps + heuristic(neighbor),
+                -degree(neighbor) if degree is not None else 0,
+                next(tie), neighbor
+            ))
+
+    return None
+
+
+# Strategies by name
+STRATEGIES = {
+    "bfs": breadth_first,
+    "bidirectional": bidirectional,
+    "astar": astar
+}
+
+
+def count(stats):
+    """
+    Counts one expanded state in `stats`, if given.
+    """
+    if stats is not None:
+        stats["expanded"] = stats.get("expanded", 0) + 1
+
+
+def path_length(parents, state):
+    """
+    Returns the number of steps from `state` to the root of `parents`.
+    """
+    length = 0
+    while parents[state] is not None:
+        state = parents[state][0]
+        length += 1
+    return length
+
+
+def join_paths(forwards, backwards, meeting):
+    """
+    Joins two halves of a search at `meeting` into a list of
+    (action, state) pairs from the root of `forwards` to the root
+    of `backwards`.
+    """
+    path = []
+    state = meeting
+    while forwards[state] is not None:
+        parent, action = forwards[state]
+        path.append((action, state))
+        state = parent
+    path.reverse()
+
+    state = meeting
+    while backwards[state] is not None:
+        state, action = backwards[state]
+        path.append((action, state))
+    return path
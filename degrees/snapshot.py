@@ -0,0 +1,60 @@
+import os
+import pickle
+
+# Bump whenever the layout of anything stored in a snapshot changes
+SNAPSHOT_VERSION = 3
+
+CSV_FILES = ("people.csv", "movies.csv", "stars.csv")
+
+
+def snapshot_key(directory):
+    """
+    Returns a key identifying the current contents of the CSV files
+    in `directory`, built from their sizes and modification times.
+    """
+    key = [SNAPSHOT_VERSION]
+    for filename in CSV_FILES:
+        stat = os.stat(os.path.join(directory, filename))
+        key.append((filename, stat.st_size, stat.st_mtime_ns))
+    return tuple(key)
+
+
+def snapshot_path(directory, kind):
+    """
+    Returns the path of the `kind` snapshot for `directory`.
+    """
+    return os.path.join(directory, f".{kind}.snapshot")
+
+
+def load_snapshot(directory, kind):
+    """
+    Returns the data stored in the `kind` snapshot for `directory`,
+    or None if there is no snapshot or the CSV files have changed.
+    """
+    try:
+        with open(snapshot_path(directory, kind), "rb") as f:
+            key, data = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+    if key != snapshot_key(directory):
+        return None
+    return data
+
+
+def save_snapshot(directory, kind, data):
+    """
+    Stores `data` as the `kind` snapshot for `directory`.
+    Failing to write the snapshot is not an error.
+    """
+    path = snapshot_path(directory, kind)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            pickle.dump((snapshot_key(directory), data), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
@@ -1,3 +1,6 @@
+from collections import Counter, deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -7,13 +10,21 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Number of nodes in the frontier for each state
+        self.states = Counter()
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] += 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
+
+    def forget(self, state):
+        self.states[state] -= 1
+        if self.states[state] == 0:
+            del self.states[state]
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,8 +33,8 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.forget(node.state)
             return node
 
 
@@ -33,6 +44,6 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.forget(node.state)
             return node
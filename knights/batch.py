@@ -0,0 +1,94 @@
+import sys
+import time
+
+from formulas import parse
+from logic import (
+    KnowledgeBase, Symbol, compiled_model_check, model_check,
+    table_model_check
+)
+from sat import sat_check
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python batch.py puzzles [solver]")
+    solver = sys.argv[2] if len(sys.argv) == 3 else "knowledge_base"
+    if solver not in SOLVERS:
+        sys.exit(f"Solver must be one of: {', '.join(SOLVERS)}")
+
+    with open(sys.argv[1], encoding="utf-8") as f:
+        times = []
+        for number, knowledge in enumerate(read_puzzles(f), 1):
+            start = time.perf_counter()
+            known = solve(knowledge, SOLVERS[solver])
+            seconds = time.perf_counter() - start
+            times.append(seconds)
+            print(f"Puzzle {number}: {seconds * 1000:.3f} ms: "
+                  + "; ".join(known))
+
+    print(summary(times))
+
+
+def entailed(check):
+    """
+    Returns a solver that checks every symbol with `check(kb, query)`.
+    """
+    return lambda knowledge, symbols: [
+        symbol for symbol in symbols if check(knowledge, symbol)
+    ]
+
+
+def knowledge_base(knowledge, symbols):
+    kb = KnowledgeBase(knowledge)
+    return [symbol for symbol in symbols if kb.entails(symbol)]
+
+
+# Solvers by name: each takes a knowledge base and a list of symbols
+# and returns the symbols it entails
+SOLVERS = {
+    "model_check": entailed(model_check),
+    "compiled": entailed(compiled_model_check),
+    "table": entailed(table_model_check),
+    "knowledge_base": knowledge_base,
+    "sat": entailed(sat_check)
+}
+
+
+def read_puzzles(lines):
+    """
+    Yields the knowledge base parsed from each line of `lines`,
+    skipping blank lines and lines starting with #.
+    """
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield parse(line)
+
+
+def solve(knowledge, solver):
+    """
+    Returns the names of the symbols `knowledge` entails, in order.
+    """
+    symbols = [Symbol(name) for name in sorted(knowledge.symbols())]
+    return [symbol.name for symbol in solver(knowledge, symbols)]
+
+
+def summary(times):
+    """
+    Returns a line summarizing per-puzzle solve times.
+    """
+    if not times:
+        return "No puzzles."
+    ordered = sorted(times)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return (f"{len(times)} puzzles in {sum(times):.3f} s: "
+            f"mean {sum(times) / len(times) * 1000:.3f} ms, "
+            f"p50 {percentile(0.5):.3f} ms, p95 {percentile(0.95):.3f} ms, "
+            f"max {ordered[-1] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
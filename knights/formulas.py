@@ -0,0 +1,123 @@
+"""
+Parser for propositional formulas in the text format
+`Sentence.formula()` produces.
+
+Operators, from tightest to loosest binding, with ASCII alternatives:
+    ¬ (or ~)     not
+    ∧ (or &)     and
+    ∨ (or |)     or
+    =>           implication, grouping to the right
+    <=>          biconditional
+Anything else between operators and parentheses is a symbol name,
+with surrounding whitespace removed, so names like "A is a Knight"
+need no quoting.
+"""
+import re
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Token kind of each operator spelling
+OPERATORS = {
+    "<=>": "<=>",
+    "=>": "=>",
+    "¬": "not", "~": "not",
+    "∧": "and", "&": "and",
+    "∨": "or", "|": "or",
+    "(": "(", ")": ")"
+}
+
+# Splits a formula into symbol names and operators
+SPLIT = re.compile("(" + "|".join(
+    re.escape(spelling)
+    for spelling in sorted(OPERATORS, key=len, reverse=True)
+) + ")")
+
+
+def tokenize(text):
+    """
+    Returns the list of (kind, value) tokens in `text`, where `kind` is
+    an operator, a parenthesis or "symbol".
+    """
+    tokens = []
+
+    # Splitting on a capturing group alternates names and operators
+    for i, part in enumerate(SPLIT.split(text)):
+        if i % 2:
+            tokens.append((OPERATORS[part], part))
+        elif part.strip():
+            tokens.append(("symbol", part.strip()))
+    return tokens
+
+
+def parse(text):
+    """
+    Returns the logical sentence written in `text`.
+    Raises ValueError if `text` is not a well-formed formula.
+    """
+    parser = Parser(tokenize(text))
+    sentence = parser.biconditional()
+    if parser.position != len(parser.tokens):
+        raise ValueError(f"unexpected {parser.peek()[1]!r} in formula")
+    return sentence
+
+
+class Parser():
+    """
+    Recursive descent parser over a list of tokens,
+    one method per level of operator precedence.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return (None, "end of formula")
+
+    def accept(self, kind):
+        """Consumes the next token if it is of kind `kind`."""
+        if self.peek()[0] == kind:
+            self.position += 1
+            return True
+        return False
+
+    def biconditional(self):
+        sentence = self.implication()
+        while self.accept("<=>"):
+            sentence = Biconditional(sentence, self.implication())
+        return sentence
+
+    def implication(self):
+        sentence = self.disjunction()
+        if self.accept("=>"):
+            return Implication(sentence, self.implication())
+        return sentence
+
+    def disjunction(self):
+        disjuncts = [self.conjunction()]
+        while self.accept("or"):
+            disjuncts.append(self.conjunction())
+        return disjuncts[0] if len(disjuncts) == 1 else Or(*disjuncts)
+
+    def conjunction(self):
+        conjuncts = [self.unary()]
+        while self.accept("and"):
+            conjuncts.append(self.unary())
+        return conjuncts[0] if len(conjuncts) == 1 else And(*conjuncts)
+
+    def unary(self):
+        kind, value = self.peek()
+        if self.accept("not"):
+            return Not(self.unary())
+        if self.accept("("):
+            sentence = self.biconditional()
+            if not self.accept(")"):
+                raise ValueError(
+                    f"expected ')' but found {self.peek()[1]!r} in formula"
+                )
+            return sentence
+        if self.accept("symbol"):
+            return Symbol(value)
+        raise ValueError(f"unexpected {value!r} in formula")
@@ -0,0 +1,73 @@
+import random
+import sys
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python generate.py count [people] [seed]")
+    count = int(sys.argv[1])
+    people = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    rng = random.Random(seed)
+    for _ in range(count):
+        print(puzzle(people, rng).formula())
+
+
+def name(i):
+    """
+    Returns the name of the `i`th person: A to Z, then P26, P27...
+    """
+    return chr(ord("A") + i) if i < 26 else f"P{i}"
+
+
+def puzzle(people, rng):
+    """
+    Returns the knowledge base of a random knights and knaves puzzle
+    with `people` people, each of whom makes one statement.
+    The statements are made up to fit a hidden assignment of knights
+    and knaves, so every generated puzzle is consistent.
+    """
+    knights = [Symbol(f"{name(i)} is a Knight") for i in range(people)]
+    knaves = [Symbol(f"{name(i)} is a Knave") for i in range(people)]
+    hidden = [rng.random() < 0.5 for _ in range(people)]
+
+    knowledge = And()
+    for i in range(people):
+
+        # Info from structure of problem
+        knowledge.add(Or(knights[i], knaves[i]))
+        knowledge.add(Implication(knights[i], Not(knaves[i])))
+
+    for speaker in range(people):
+        x = rng.randrange(people)
+        y = rng.randrange(people)
+        kind = rng.randrange(4)
+        if kind == 0:
+            # "X is a knight."
+            statement, truth = knights[x], hidden[x]
+        elif kind == 1:
+            # "X and Y are the same kind."
+            statement = Biconditional(knights[x], knights[y])
+            truth = hidden[x] == hidden[y]
+        elif kind == 2:
+            # "At least one of X and Y is a knave."
+            statement = Or(knaves[x], knaves[y])
+            truth = not hidden[x] or not hidden[y]
+        else:
+            # "X and Y are both knights."
+            statement = And(knights[x], knights[y])
+            truth = hidden[x] and hidden[y]
+
+        # Knights only say true things and knaves only false ones
+        if truth != hidden[speaker]:
+            statement = Not(statement)
+        knowledge.add(Biconditional(knights[speaker], statement))
+
+    return knowledge
+
+
+if __name__ == "__main__":
+    main()
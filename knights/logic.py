@@ -1,4 +1,8 @@
 import itertools
+import multiprocessing
+import weakref
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 
 
 class Sentence():
@@ -15,6 +19,29 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def expression(self, index):
+        """
+        Returns a Python expression evaluating the logical sentence on
+        an integer model `m`, where symbol `name` is bit `index[name]`.
+        """
+        raise Exception("nothing to compile")
+
+    def truth_table(self, columns, full):
+        """
+        Returns the truth table of the logical sentence as an integer
+        whose bit `m` is set if the sentence is true in model `m`.
+        `columns` maps each symbol to its own truth table and `full`
+        has every model's bit set.
+        """
+        raise Exception("nothing to evaluate")
+
+    def compile(self, index):
+        """
+        Returns a function evaluating the logical sentence on integer
+        models, where symbol `name` is bit `index[name]` of the model.
+        """
+        return compile_expression(self.expression(index))
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -68,6 +95,18 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def expression(self, index):
+        try:
+            return f"(m >> {index[self.name]} & 1)"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
+    def truth_table(self, columns, full):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
 
 class Not(Sentence):
     def __init__(self, operand):
@@ -92,6 +131,12 @@ class Not(Sentence):
     def symbols(self):
         return self.operand.symbols()
 
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
+    def truth_table(self, columns, full):
+        return full ^ self.operand.truth_table(columns, full)
+
 
 class And(Sentence):
     def __init__(self, *conjuncts):
@@ -129,6 +174,19 @@ class And(Sentence):
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            [conjunct.expression(index) for conjunct in self.conjuncts]
+        ) + ")"
+
+    def truth_table(self, columns, full):
+        table = full
+        for conjunct in self.conjuncts:
+            table &= conjunct.truth_table(columns, full)
+        return table
+
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
@@ -160,6 +218,19 @@ class Or(Sentence):
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            [disjunct.expression(index) for disjunct in self.disjuncts]
+        ) + ")"
+
+    def truth_table(self, columns, full):
+        table = 0
+        for disjunct in self.disjuncts:
+            table |= disjunct.truth_table(columns, full)
+        return table
+
 
 class Implication(Sentence):
     def __init__(self, antecedent, consequent):
@@ -191,6 +262,16 @@ class Implication(Sentence):
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"(not {antecedent} or {consequent})"
+
+    def truth_table(self, columns, full):
+        antecedent = self.antecedent.truth_table(columns, full)
+        consequent = self.consequent.truth_table(columns, full)
+        return (full ^ antecedent) | consequent
+
 
 class Biconditional(Sentence):
     def __init__(self, left, right):
@@ -217,13 +298,139 @@ class Biconditional(Sentence):
                     and not self.right.evaluate(model)))
 
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
+    def expression(self, index):
+        left = self.left.expression(index)
+        right = self.right.expression(index)
+        return f"((not {left}) == (not {right}))"
+
+    def truth_table(self, columns, full):
+        left = self.left.truth_table(columns, full)
+        right = self.right.truth_table(columns, full)
+        return full ^ (left ^ right)
+
+
+class Interned():
+    """
+    Mixin for sentences stored once by an `Interner`. Interned sentences
+    are immutable, so their hash, symbols and formula are computed once
+    when they are interned, and equal ones are the same object.
+    """
+
+    def __eq__(self, other):
+        return self is other or super().__eq__(other)
+
+    def __hash__(self):
+        return self.cached_hash
+
+    def symbols(self):
+        return set(self.cached_symbols)
+
+    def formula(self):
+        return self.cached_formula
+
+    def add(self, conjunct):
+        raise Exception("interned sentences cannot be changed")
+
+
+class InternedSymbol(Interned, Symbol):
+    pass
+
+
+class InternedNot(Interned, Not):
+    pass
+
+
+class InternedAnd(Interned, And):
+    pass
+
+
+class InternedOr(Interned, Or):
+    pass
+
+
+class InternedImplication(Interned, Implication):
+    pass
+
+
+class InternedBiconditional(Interned, Biconditional):
+    pass
+
+
+class Interner():
+    """
+    Hash-consing table of sentences: structurally equal sentences are
+    interned to a single shared `Interned` object. Entries are dropped
+    once nothing else refers to them.
+    """
+
+    def __init__(self):
+        self.table = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return len(self.table)
+
+    def intern(self, sentence):
+        """Returns the interned sentence equal to `sentence`."""
+        if isinstance(sentence, Interned):
+            return sentence
+        if isinstance(sentence, Symbol):
+            return self.lookup(Symbol, InternedSymbol, sentence.name)
+        if isinstance(sentence, Not):
+            return self.lookup(Not, InternedNot,
+                               self.intern(sentence.operand))
+        if isinstance(sentence, And):
+            return self.lookup(And, InternedAnd, *[
+                self.intern(conjunct) for conjunct in sentence.conjuncts
+            ])
+        if isinstance(sentence, Or):
+            return self.lookup(Or, InternedOr, *[
+                self.intern(disjunct) for disjunct in sentence.disjuncts
+            ])
+        if isinstance(sentence, Implication):
+            return self.lookup(Implication, InternedImplication,
+                               self.intern(sentence.antecedent),
+                               self.intern(sentence.consequent))
+        if isinstance(sentence, Biconditional):
+            return self.lookup(Biconditional, InternedBiconditional,
+                               self.intern(sentence.left),
+                               self.intern(sentence.right))
+        raise TypeError("must be a logical sentence")
+
+    def lookup(self, base, interned, *arguments):
+        """
+        Returns the interned `base` sentence built from `arguments`,
+        which are a symbol name or already interned sentences.
+        """
+        # Interned arguments are unique, so their ids identify them
+        key = (base, tuple(
+            argument if isinstance(argument, str) else id(argument)
+            for argument in arguments
+        ))
+        sentence = self.table.get(key)
+        if sentence is None:
+            sentence = interned(*arguments)
+            sentence.cached_hash = base.__hash__(sentence)
+            sentence.cached_symbols = frozenset(base.symbols(sentence))
+            sentence.cached_formula = base.formula(sentence)
+            self.table[key] = sentence
+        return sentence
+
+
+# Shared table used by `intern`
+interner = Interner()
+
+
+def intern(sentence):
+    """Returns the interned sentence equal to `sentence`."""
+    return interner.intern(sentence)
+
 
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
@@ -261,3 +468,199 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+@lru_cache(maxsize=256)
+def compile_expression(expression):
+    """Compiles a Python expression over integer model `m`."""
+    return eval(f"lambda m: bool({expression})")
+
+
+def compiled_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, like `model_check`, but
+    compiles each sentence into a Python function (cached across calls)
+    and enumerates models as integer bitmasks instead of dicts.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    knowledge = knowledge.compile(index)
+    query = query.compile(index)
+    return all(query(m) for m in range(1 << len(symbols)) if knowledge(m))
+
+
+# Models each parallel worker checks between looks at the stop event
+STOP_INTERVAL = 4096
+
+# Set in parallel workers once any of them has found a counter-model
+stop_event = None
+
+
+def parallel_model_check(knowledge, query, split=4, workers=None):
+    """
+    Checks if knowledge base entails query, like `model_check`, but
+    splits the models on the values of the first `split` symbols into
+    2 ** split independent parts checked by a pool of `workers`
+    processes. As soon as any part holds a model where the knowledge
+    base is true and the query false, the remaining parts are cancelled.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    split = min(split, len(symbols))
+    stop = multiprocessing.Event()
+    with ProcessPoolExecutor(workers, initializer=set_stop_event,
+                             initargs=(stop,)) as executor:
+        parts = [
+            executor.submit(check_part, knowledge, query, symbols, split,
+                            prefix)
+            for prefix in range(1 << split)
+        ]
+        for part in as_completed(parts):
+            if not part.result():
+                stop.set()
+                for other in parts:
+                    other.cancel()
+                return False
+    return True
+
+
+def set_stop_event(event):
+    """Initializes a parallel worker with the shared stop event."""
+    global stop_event
+    stop_event = event
+
+
+def check_part(knowledge, query, symbols, split, prefix):
+    """
+    Checks that query holds in every model of knowledge whose first
+    `split` symbols take the values given by the bits of `prefix`.
+    Gives up early, returning True, once another part has failed.
+    """
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    knowledge = knowledge.compile(index)
+    query = query.compile(index)
+    for rest in range(1 << (len(symbols) - split)):
+        if (rest % STOP_INTERVAL == 0 and stop_event is not None
+                and stop_event.is_set()):
+            return True
+        model = rest << split | prefix
+        if knowledge(model) and not query(model):
+            return False
+    return True
+
+
+# Largest number of symbols truth tables are built for: each table
+# holds one bit per model, so 2 ** 25 bits (4 MiB) per subsentence
+MAX_TABLE_SYMBOLS = 25
+
+
+def symbol_columns(symbols):
+    """
+    Returns the truth table of each of `symbols` over all of their
+    models, and the table with every model's bit set. Model `m` gives
+    the `i`th symbol the value of bit `i` of `m`.
+    """
+    models = 1 << len(symbols)
+    full = (1 << models) - 1
+    columns = {}
+    for i, symbol in enumerate(symbols):
+
+        # Runs of 2 ** i false models then 2 ** i true models, doubled
+        # up until they cover every model
+        run = 1 << i
+        table = ((1 << run) - 1) << run
+        width = 2 * run
+        while width < models:
+            table |= table << width
+            width *= 2
+        columns[symbol] = table
+    return columns, full
+
+
+def table_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, like `model_check`, but
+    evaluates every model at once: each sentence becomes a truth table
+    with one bit per model, and each connective a single bitwise
+    operation over the whole table.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    if len(symbols) > MAX_TABLE_SYMBOLS:
+        raise Exception(f"too many symbols for truth tables: {len(symbols)}")
+    columns, full = symbol_columns(symbols)
+    knowledge = knowledge.truth_table(columns, full)
+    query = query.truth_table(columns, full)
+    return knowledge & (full ^ query) == 0
+
+
+class KnowledgeBase():
+    """
+    Knowledge base that keeps the truth table of its models, so that
+    many queries are answered without enumerating the models again.
+
+    Conjuncts appended to `knowledge` with `And.add` are folded into the
+    existing table on the next query. Adding knowledge never undoes an
+    entailment, so only cached answers that were false are dropped.
+    Any other change to the sentence needs `reset`.
+    """
+
+    def __init__(self, knowledge=None):
+        if knowledge is None:
+            knowledge = And()
+        elif not isinstance(knowledge, And):
+            knowledge = And(knowledge)
+        self.knowledge = knowledge
+        self.reset()
+
+    def reset(self):
+        """Forgets every model and answer, to be rebuilt on next use."""
+        self.symbols = []
+        self.columns, self.full = symbol_columns(self.symbols)
+        self.models = self.full
+        self.added = 0
+        self.answers = {}
+
+    def add(self, sentence):
+        """Adds `sentence` to the knowledge base."""
+        self.knowledge.add(sentence)
+
+    def include(self, symbols):
+        """Extends the table of models to cover `symbols`."""
+        new = sorted(set(symbols) - set(self.columns))
+        if not new:
+            return
+        if len(self.symbols) + len(new) > MAX_TABLE_SYMBOLS:
+            raise Exception("too many symbols for truth tables: "
+                            f"{len(self.symbols) + len(new)}")
+
+        # A new symbol is unconstrained: every model holds with it
+        # either false or true
+        width = 1 << len(self.symbols)
+        for symbol in new:
+            self.models |= self.models << width
+            width *= 2
+        self.symbols.extend(new)
+        self.columns, self.full = symbol_columns(self.symbols)
+
+    def update(self):
+        """Folds any newly added conjuncts into the table of models."""
+        conjuncts = self.knowledge.conjuncts
+        if self.added == len(conjuncts):
+            return
+        for conjunct in conjuncts[self.added:]:
+            self.include(conjunct.symbols())
+            self.models &= conjunct.truth_table(self.columns, self.full)
+        self.added = len(conjuncts)
+        self.answers = {
+            query: answer for query, answer in self.answers.items() if answer
+        }
+
+    def entails(self, query):
+        """Checks if the knowledge base entails `query`."""
+        self.update()
+        if query in self.answers:
+            return self.answers[query]
+        self.include(query.symbols())
+        table = query.truth_table(self.columns, self.full)
+        answer = self.models & (self.full ^ table) == 0
+        self.answers[query] = answer
+        return answer
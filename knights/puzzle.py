@@ -79,8 +79,10 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            # Enumerate the puzzle's models once for every symbol
+            kb = KnowledgeBase(knowledge)
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if kb.entails(symbol):
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,484 @@
+import heapq
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Conjunctive normal form of logical sentences, built with the Tseitin
+    transformation: every compound subsentence gets a fresh variable
+    constrained to equal it, so the number of clauses grows linearly
+    with the size of the sentence.
+
+    Variables are positive integers; literal `-v` is the negation of
+    variable `v`. Symbols are numbered first, in order of appearance.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = {}
+        self.count = 0
+        self.encoded = {}
+        self.true = None
+
+    def variable(self, name):
+        """
+        Returns the variable for symbol `name`, creating it if needed.
+        """
+        if name not in self.variables:
+            self.variables[name] = self.fresh()
+        return self.variables[name]
+
+    def fresh(self):
+        self.count += 1
+        return self.count
+
+    def constant(self, value):
+        """
+        Returns a literal that is always `value`.
+        """
+        if self.true is None:
+            self.true = self.fresh()
+            self.clauses.append([self.true])
+        return self.true if value else -self.true
+
+    def add(self, sentence):
+        """
+        Adds clauses requiring `sentence` to be true.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append(
+                [self.encode(disjunct) for disjunct in sentence.disjuncts]
+            )
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.encode(sentence.antecedent),
+                                 self.encode(sentence.consequent)])
+        else:
+            self.clauses.append([self.encode(sentence)])
+
+    def encode(self, sentence):
+        """
+        Returns a literal equal to `sentence`, adding the clauses
+        that define it. Equal subsentences share one literal.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.encode(sentence.operand)
+        if sentence in self.encoded:
+            return self.encoded[sentence]
+
+        if isinstance(sentence, And):
+            literal = self.gate(
+                [self.encode(c) for c in sentence.conjuncts], True
+            )
+        elif isinstance(sentence, Or):
+            literal = self.gate(
+                [self.encode(d) for d in sentence.disjuncts], False
+            )
+        elif isinstance(sentence, Implication):
+            literal = self.gate([-self.encode(sentence.antecedent),
+                                 self.encode(sentence.consequent)], False)
+        elif isinstance(sentence, Biconditional):
+            left = self.encode(sentence.left)
+            right = self.encode(sentence.right)
+            literal = self.fresh()
+            self.clauses.extend([
+                [-literal, -left, right],
+                [-literal, left, -right],
+                [literal, left, right],
+                [literal, -left, -right]
+            ])
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.encoded[sentence] = literal
+        return literal
+
+    def gate(self, literals, conjunction):
+        """
+        Returns a literal equal to the conjunction (or disjunction)
+        of `literals`.
+        """
+        if not literals:
+            return self.constant(conjunction)
+        if len(literals) == 1:
+            return literals[0]
+        sign = 1 if conjunction else -1
+        literal = self.fresh()
+        for operand in literals:
+            self.clauses.append([-sign * literal, sign * operand])
+        self.clauses.append(
+            [sign * literal] + [-sign * operand for operand in literals]
+        )
+        return literal
+
+
+# Conflicts per unit of the Luby restart sequence
+RESTART_UNIT = 100
+
+# Conflicts before the first reduction of the learnt clauses, and how
+# many more are allowed before each following one
+REDUCE_FIRST = 2000
+REDUCE_INCREMENT = 300
+
+
+def luby(i):
+    """
+    Returns the `i`th term (from 1) of the Luby sequence
+    1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ...
+    """
+    while True:
+        # The sequence up to a term 2 ** k is two copies of the sequence
+        # up to 2 ** (k - 1) followed by that term, 2 ** (k + 1) - 1 terms
+        size = 1
+        while size < i:
+            size = 2 * size + 1
+        if size == i:
+            return (size + 1) // 2
+        i -= size // 2
+
+
+class Solver():
+    """
+    Conflict-driven clause learning SAT solver.
+
+    Uses two watched literals per clause for unit propagation, learns a
+    first-UIP clause from every conflict and backjumps non-chronologically,
+    picks decisions by variable activity and restarts on the Luby
+    sequence. Learnt clauses are periodically halved, keeping those
+    whose literals span the fewest decision levels (LBD), which best
+    predicts that a clause will be useful again.
+    """
+
+    def __init__(self, count, clauses):
+        self.count = count
+
+        # Truth of every literal, indexed by the literal itself: negative
+        # literals wrap around to the upper half of the list
+        self.truth = [0] * (2 * count + 1)
+        self.value = [0] * (count + 1)
+        self.level = [0] * (count + 1)
+        self.reason = [None] * (count + 1)
+        self.phase = [-1] * (count + 1)
+        self.activity = [0.0] * (count + 1)
+        self.increment = 1.0
+        self.heap = [(-0.0, v) for v in range(1, count + 1)]
+        self.queued = [True] * (count + 1)
+        self.trail = []
+        self.limits = []
+        self.head = 0
+        # Clauses watching each literal, indexed like `truth`
+        self.watches = [[] for _ in range(2 * count + 1)]
+        self.units = []
+        self.empty = False
+
+        # Learnt clauses and the LBD of each, by clause id
+        self.learnts = []
+        self.lbd = {}
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, literals):
+        """
+        Adds an input clause, dropping repeated literals and tautologies.
+        """
+        clause = list(dict.fromkeys(literals))
+        if any(-literal in clause for literal in clause):
+            return
+        if not clause:
+            self.empty = True
+        elif len(clause) == 1:
+            self.units.append(clause[0])
+        else:
+            self.watch(clause)
+
+    def watch(self, clause):
+        for literal in clause[:2]:
+            self.watches[literal].append(clause)
+
+    def enqueue(self, literal, reason):
+        """
+        Assigns `literal` true. Returns False if it is already false.
+        """
+        value = self.truth[literal]
+        if value:
+            return value > 0
+        variable = abs(literal)
+        self.truth[literal] = 1
+        self.truth[-literal] = -1
+        self.value[variable] = 1 if literal > 0 else -1
+        self.level[variable] = len(self.limits)
+        self.reason[variable] = reason
+        self.trail.append(literal)
+        return True
+
+    def propagate(self):
+        """
+        Propagates all assignments on the trail.
+        Returns a conflicting clause, or None.
+        """
+        truth = self.truth
+        watches = self.watches
+        trail = self.trail
+        current = len(self.limits)
+        while self.head < len(trail):
+            false = -trail[self.head]
+            self.head += 1
+            watching = watches[false]
+            kept = []
+            for i, clause in enumerate(watching):
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                if truth[first] > 0:
+                    kept.append(clause)
+                    continue
+
+                # Look for a new literal to watch instead
+                for k in range(2, len(clause)):
+                    if truth[clause[k]] >= 0:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if truth[first]:
+                        kept.extend(watching[i + 1:])
+                        watches[false] = kept
+                        return clause
+
+                    # Same as `enqueue`, inlined as the hottest path
+                    variable = abs(first)
+                    truth[first] = 1
+                    truth[-first] = -1
+                    self.value[variable] = 1 if first > 0 else -1
+                    self.level[variable] = current
+                    self.reason[variable] = clause
+                    trail.append(first)
+            watches[false] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the first-UIP clause learnt from `conflict`, with the
+        asserting literal first, and the level to backjump to.
+        """
+        seen = set()
+        learnt = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        current = len(self.limits)
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen:
+                    continue
+                if self.level[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.level[variable] == current:
+                    pending += 1
+                else:
+                    learnt.append(other)
+
+            # Walk back to the next literal involved in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reason[abs(literal)]
+        learnt[0] = -literal
+
+        # Drop literals implied by the rest of the clause
+        variables = {abs(other) for other in learnt}
+        learnt = [learnt[0]] + [
+            other for other in learnt[1:]
+            if not self.redundant(other, variables)
+        ]
+
+        level = 0
+        if len(learnt) > 1:
+            best = max(range(1, len(learnt)),
+                       key=lambda k: self.level[abs(learnt[k])])
+            learnt[1], learnt[best] = learnt[best], learnt[1]
+            level = self.level[abs(learnt[1])]
+        return learnt, level
+
+    def reduce(self):
+        """
+        Forgets the learnt clauses in the worse half by LBD, except
+        those spanning two levels or fewer and those that are the
+        reason for a current assignment.
+        """
+        learnts = sorted(self.learnts, key=lambda clause: self.lbd[id(clause)])
+        keep = len(learnts) // 2
+        forgotten = set()
+        for clause in learnts[keep:]:
+            if (self.lbd[id(clause)] > 2
+                    and self.reason[abs(clause[0])] is not clause):
+                forgotten.add(id(clause))
+        if not forgotten:
+            return
+
+        self.learnts = [clause for clause in self.learnts
+                        if id(clause) not in forgotten]
+        for clause_id in forgotten:
+            del self.lbd[clause_id]
+        for literal, watching in enumerate(self.watches):
+            self.watches[literal] = [clause for clause in watching
+                                     if id(clause) not in forgotten]
+
+    def redundant(self, literal, variables):
+        """
+        Checks if false `literal` was propagated only from other
+        variables in `variables` or from level 0 assignments.
+        """
+        reason = self.reason[abs(literal)]
+        if reason is None:
+            return False
+        return all(
+            abs(other) in variables or self.level[abs(other)] == 0
+            for other in reason if other != -literal
+        )
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[v], v)
+                         for v in range(1, self.count + 1)]
+            self.queued = [True] * (self.count + 1)
+            heapq.heapify(self.heap)
+        else:
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+            self.queued[variable] = True
+
+    def backtrack(self, level):
+        """
+        Undoes every assignment made above decision level `level`.
+        """
+        if len(self.limits) <= level:
+            return
+        for literal in self.trail[self.limits[level]:]:
+            variable = abs(literal)
+            self.phase[variable] = self.value[variable]
+            self.value[variable] = 0
+            self.truth[literal] = self.truth[-literal] = 0
+            self.reason[variable] = None
+            if not self.queued[variable]:
+                heapq.heappush(self.heap,
+                               (-self.activity[variable], variable))
+                self.queued[variable] = True
+        del self.trail[self.limits[level]:]
+        del self.limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """
+        Returns the unassigned variable with the highest activity,
+        or None if every variable is assigned.
+
+        Heap entries are never updated in place: bumping a variable
+        pushes a new entry and the outdated one is skipped here.
+        Assigned variables are dropped and pushed again on backtrack.
+        """
+        while self.heap:
+            activity, variable = heapq.heappop(self.heap)
+            if -activity != self.activity[variable]:
+                continue
+            self.queued[variable] = False
+            if not self.value[variable]:
+                return variable
+        return None
+
+    def solve(self):
+        """
+        Returns a satisfying assignment as a list indexed by variable
+        (True or False, index 0 unused), or None if unsatisfiable.
+        """
+        if self.empty:
+            return None
+        for literal in self.units:
+            if not self.enqueue(literal, None):
+                return None
+
+        conflicts = 0
+        restarts = 1
+        restart = RESTART_UNIT
+        reductions = 0
+        reduce = REDUCE_FIRST
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.limits:
+                    return None
+                conflicts += 1
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.watch(learnt)
+                    self.learnts.append(learnt)
+                    self.lbd[id(learnt)] = len(
+                        {self.level[abs(other)] for other in learnt}
+                    )
+                    self.enqueue(learnt[0], learnt)
+                self.increment *= 1.05
+                continue
+
+            if conflicts >= restart:
+                restarts += 1
+                restart = conflicts + RESTART_UNIT * luby(restarts)
+                self.backtrack(0)
+                if conflicts >= reduce:
+                    reductions += 1
+                    reduce = (conflicts + REDUCE_FIRST
+                              + REDUCE_INCREMENT * reductions)
+                    self.reduce()
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                return [None] + [value > 0 for value in self.value[1:]]
+            self.limits.append(len(self.trail))
+            self.enqueue(variable * self.phase[variable], None)
+
+
+def satisfiable(sentence):
+    """
+    Returns a model of `sentence` mapping symbol names to truth values,
+    or None if the sentence is unsatisfiable.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    values = Solver(cnf.count, cnf.clauses).solve()
+    if values is None:
+        return None
+    return {name: values[v] for name, v in cnf.variables.items()}
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by showing that
+    knowledge and not query together are unsatisfiable.
+    Gives the same answers as `logic.model_check`.
+
+    Knowledge bases with thousands of loosely related symbols are quick,
+    but when every symbol is tied to others, as in the puzzles from
+    `generate.py`, the search stays exponential: a query takes seconds
+    with 1000 people, about a minute with 1500 and over ten minutes
+    with 2000.
+    """
+    return satisfiable(And(knowledge, Not(query))) is None
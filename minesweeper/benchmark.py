@@ -0,0 +1,134 @@
+import multiprocessing
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Games played and board used when not given on the command line
+GAMES = 100
+HEIGHT = 16
+WIDTH = 16
+DENSITY = 0.15
+
+
+def main():
+    if len(sys.argv) > 7:
+        sys.exit("Usage: python benchmark.py "
+                 "[games] [height] [width] [density] [processes] [seed]")
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else HEIGHT
+    width = int(sys.argv[3]) if len(sys.argv) > 3 else WIDTH
+    density = float(sys.argv[4]) if len(sys.argv) > 4 else DENSITY
+    processes = int(sys.argv[5]) if len(sys.argv) > 5 else 1
+    seed = int(sys.argv[6]) if len(sys.argv) > 6 else 0
+
+    mines = round(height * width * density)
+    if not 0 < mines < height * width:
+        sys.exit("Density must leave at least one mine and one safe cell")
+
+    print(f"{games} games on {height}x{width} with {mines} mines, "
+          f"{processes} processes, seed {seed}")
+    start = time.perf_counter()
+    results = run(games, height, width, mines, processes, seed)
+    print(summary(results, time.perf_counter() - start))
+
+
+def run(games, height, width, mines, processes=1, seed=0):
+    """
+    Plays `games` games, the k-th seeded with `seed + k`, and returns
+    their results in order. The results do not depend on the number
+    of `processes` the games are spread over.
+    """
+    tasks = [(height, width, mines, seed + k) for k in range(games)]
+    if processes <= 1:
+        return [play(*task) for task in tasks]
+    chunksize = max(1, games // (4 * processes))
+    with multiprocessing.Pool(processes) as pool:
+        return pool.starmap(play, tasks, chunksize)
+
+
+def play(height, width, mines, seed):
+    """
+    Lets the AI play one game seeded with `seed`, as runner.py would:
+    a known safe move if there is one, a guess otherwise.
+
+    Returns a dict with whether the game was won, the moves made, the
+    seconds spent playing, the seconds each call to `add_knowledge`
+    took and the seconds each guess took to choose.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mine_count=mines)
+    safe_cells = height * width - mines
+    inference = []
+    guessing = []
+    won = False
+
+    start = time.perf_counter()
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            before = time.perf_counter()
+            move = ai.make_random_move()
+            guessing.append(time.perf_counter() - before)
+        if move is None or game.is_mine(move):
+            break
+        nearby = game.nearby_mines(move)
+        before = time.perf_counter()
+        ai.add_knowledge(move, nearby)
+        inference.append(time.perf_counter() - before)
+        if len(ai.moves_made) == safe_cells:
+            won = True
+            break
+
+    return {
+        "won": won,
+        "moves": len(inference),
+        "guesses": len(guessing),
+        "seconds": time.perf_counter() - start,
+        "inference": inference,
+        "guessing": guessing
+    }
+
+
+def summary(results, seconds):
+    """
+    Returns lines summarizing the `results` of games played in
+    `seconds` of wall time.
+    """
+    if not results:
+        return "No games."
+    wins = sum(result["won"] for result in results)
+    moves = sum(result["moves"] for result in results)
+    guesses = sum(result["guesses"] for result in results)
+    playing = sum(result["seconds"] for result in results)
+    lines = [
+        f"won {wins} of {len(results)} ({wins / len(results):.1%})",
+        f"{moves} moves, {guesses} guesses, "
+        f"{moves / playing if playing else 0:.0f} moves/s per process, "
+        f"{moves / seconds if seconds else 0:.0f} moves/s overall, "
+        f"{seconds:.3f} s"
+    ]
+    for name, key in (("inference per move", "inference"),
+                      ("time per guess", "guessing")):
+        times = sorted(t for result in results for t in result[key])
+        if times:
+            lines.append(f"{name}: {percentiles(times)}")
+    return "\n".join(lines)
+
+
+def percentiles(times):
+    """
+    Returns the mean and percentiles of sorted `times`, in milliseconds.
+    """
+    def percentile(p):
+        return times[min(len(times) - 1, int(p * len(times)))] * 1000
+
+    return (f"mean {sum(times) / len(times) * 1000:.3f} ms, "
+            f"p50 {percentile(0.5):.3f} ms, p90 {percentile(0.9):.3f} ms, "
+            f"p99 {percentile(0.99):.3f} ms, max {times[-1] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
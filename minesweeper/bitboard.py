@@ -0,0 +1,82 @@
+"""
+Sets of board cells stored as Python ints, one bit per cell.
+
+Cell (i, j) of a board `width` cells wide is bit i * width + j, so set
+operations are single integer operations and a random member is found
+with a binary search over population counts.
+"""
+from random import randrange
+
+
+def bit(cell, width):
+    """
+    Returns the index of the bit for `cell`.
+    """
+    i, j = cell
+    return i * width + j
+
+
+def full(height, width):
+    """
+    Returns the mask of every cell of the board.
+    """
+    return (1 << (height * width)) - 1
+
+
+def from_cells(cells, width):
+    """
+    Returns the mask of `cells`.
+    """
+    mask = 0
+    for cell in cells:
+        mask |= 1 << bit(cell, width)
+    return mask
+
+
+def cells(mask, width):
+    """
+    Yields the cells in `mask`, in row-major order.
+    """
+    while mask:
+        low = mask & -mask
+        yield divmod(low.bit_length() - 1, width)
+        mask ^= low
+
+
+def select(mask, rank):
+    """
+    Returns the index of the set bit of `mask` with `rank` set bits
+    below it.
+    """
+    low, high = 0, mask.bit_length()
+    while high - low > 1:
+        middle = (low + high) // 2
+        if (mask & ((1 << middle) - 1)).bit_count() > rank:
+            high = middle
+        else:
+            low = middle
+    return low
+
+
+def random_cell(mask, width):
+    """
+    Returns a cell chosen uniformly from `mask`, or None if it is empty.
+    """
+    count = mask.bit_count()
+    if not count:
+        return None
+    return divmod(select(mask, randrange(count)), width)
+
+
+def neighbor_counts(mines, height, width):
+    """
+    Returns, for every cell in row-major order, the number of cells in
+    `mines` within one row and column of it, not counting itself.
+    """
+    counts = bytearray(height * width)
+    for i, j in mines:
+        for row in range(max(i - 1, 0), min(i + 2, height)):
+            for column in range(max(j - 1, 0), min(j + 2, width)):
+                if (row, column) != (i, j):
+                    counts[row * width + column] += 1
+    return counts
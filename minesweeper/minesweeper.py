@@ -1,9 +1,16 @@
-from itertools import combinations, product
-from random import randrange, choice
+from collections import deque
+from random import randrange
+
+import bitboard
+from solver import mine_probabilities
 
 class Minesweeper():
     """
     Minesweeper game representation
+
+    The board is a bitmask of mine cells (see bitboard.py), and the
+    number of mines next to every cell is counted once, when the board
+    is created.
     """
     def __init__(self, height=8, width=8, mines=8):
 
@@ -13,20 +20,18 @@ class Minesweeper():
         self.mines = set()
 
         # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        self.board = 0
 
         # Add mines randomly
         while len(self.mines) != mines:
             i = randrange(height)
             j = randrange(width)
-            if not self.board[i][j]:
+            if not self.is_mine((i, j)):
                 self.mines.add((i, j))
-                self.board[i][j] = True
+                self.board |= 1 << bitboard.bit((i, j), width)
+
+        # Count the mines next to every cell
+        self.counts = bitboard.neighbor_counts(self.mines, height, width)
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -39,7 +44,7 @@ class Minesweeper():
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.is_mine((i, j)):
                     print("|X", end="")
                 else:
                     print("| ", end="")
@@ -47,8 +52,7 @@ class Minesweeper():
         print("--" * self.width + "-")
 
     def is_mine(self, cell):
-        i, j = cell
-        return self.board[i][j]
+        return bool(self.board >> bitboard.bit(cell, self.width) & 1)
 
     def nearby_mines(self, cell):
         """
@@ -56,19 +60,7 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
-        # Keep count of nearby mines
-        count = 0
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-        return count
+        return self.counts[bitboard.bit(cell, self.width)]
 
     def won(self):
         """
@@ -92,6 +84,13 @@ class Sentence():
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
+    def key(self):
+        """
+        Returns a hashable snapshot of the sentence, equal for equal
+        sentences. Changes whenever the sentence is updated.
+        """
+        return (frozenset(self.cells), self.count)
+
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
@@ -136,24 +135,50 @@ class Sentence():
         else:
             return None
 
-class MinesweeperAI():  
+class MinesweeperAI():
     """
     Minesweeper game player
     input: a cell in form (i, j) + self.count
     update: mines, safes, moves_made, knowledge
+
+    Sentences are indexed by the cells they mention, and inference only
+    revisits sentences that changed, so the work per move grows with the
+    part of the board the move touches rather than with all knowledge.
+
+    If `mine_count`, the number of mines on the board, is given, random
+    moves go to the cell least likely to be a mine.
     """
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mine_count=None):
 
         # Set initial height and width
         self.height = height
         self.width = width
+        self.mine_count = mine_count
         # Keep track of which cells have been clicked on
         self.moves_made = set()
         # Keep track of cells known to be safe or mines
         self.mines = set()
         self.safes = set()
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Bitmasks of the cells not known to be safe or mines, and of
+        # the safe cells not clicked on yet
+        self.unknown = bitboard.full(height, width)
+        self.safe_moves = 0
+        # Sentences about the game known to be true, by id
+        self.sentences = {}
+        self.next_id = 0
+        # Ids of the sentences mentioning each cell
+        self.index = {}
+        # Id of the sentence with each key, to skip duplicates
+        self.keys = {}
+        # Ids of sentences that changed and need inference
+        self.pending = deque()
+
+    @property
+    def knowledge(self):
+        """
+        List of sentences about the game known to be true.
+        """
+        return list(self.sentences.values())
 
     def mark_mine(self, cell):
         """
@@ -161,8 +186,12 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        self.unknown &= ~(1 << bitboard.bit(cell, self.width))
+        for sentence_id in self.index.pop(cell, set()):
+            sentence = self.sentences[sentence_id]
+            self.forget_key(sentence_id)
             sentence.mark_mine(cell)
+            self.update_key(sentence_id)
 
     def mark_safe(self, cell):
         """
@@ -170,8 +199,64 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        self.unknown &= ~(1 << bitboard.bit(cell, self.width))
+        if cell not in self.moves_made:
+            self.safe_moves |= 1 << bitboard.bit(cell, self.width)
+        for sentence_id in self.index.pop(cell, set()):
+            sentence = self.sentences[sentence_id]
+            self.forget_key(sentence_id)
             sentence.mark_safe(cell)
+            self.update_key(sentence_id)
+
+    def add_sentence(self, cells, count):
+        """
+        Adds a sentence about unknown `cells` to the knowledge base
+        unless an equal one is already known, and queues it for
+        inference.
+        """
+        key = (frozenset(cells), count)
+        if key in self.keys:
+            return
+        sentence_id = self.next_id
+        self.next_id += 1
+        self.sentences[sentence_id] = Sentence(cells, count)
+        self.keys[key] = sentence_id
+        for cell in cells:
+            self.index.setdefault(cell, set()).add(sentence_id)
+        self.pending.append(sentence_id)
+
+    def remove_sentence(self, sentence_id):
+        """
+        Removes a sentence from the knowledge base and the index.
+        """
+        self.forget_key(sentence_id)
+        sentence = self.sentences.pop(sentence_id)
+        for cell in sentence.cells:
+            ids = self.index.get(cell)
+            if ids is not None:
+                ids.discard(sentence_id)
+                if not ids:
+                    del self.index[cell]
+
+    def forget_key(self, sentence_id):
+        """
+        Stops recording the current key of a sentence.
+        """
+        key = self.sentences[sentence_id].key()
+        if self.keys.get(key) == sentence_id:
+            del self.keys[key]
+
+    def update_key(self, sentence_id):
+        """
+        Records the new key of a changed sentence, dropping it if it now
+        duplicates another one, and queues it for inference.
+        """
+        key = self.sentences[sentence_id].key()
+        if key in self.keys:
+            self.remove_sentence(sentence_id)
+        else:
+            self.keys[key] = sentence_id
+            self.pending.append(sentence_id)
 
     def add_knowledge(self, cell, count):
         """
@@ -189,46 +274,59 @@ class MinesweeperAI():
         """
         # 1 mark the cell as a move that has been made
         self.moves_made.add(cell)
+        self.safe_moves &= ~(1 << bitboard.bit(cell, self.width))
         # 2 mark the cell as safe
         self.mark_safe(cell)
-        # 3 create new centence with list of neighboing cells
-        sent_new = Sentence(self.neighboring_cell(cell), count)
-        # check all the cells in new sentence if they are  mines
-        for i in self.mines:
-            sent_new.mark_mine(i)
-        # check all cells in new sentenve if they are safe
-        for i in self.safes:
-            sent_new.mark_safe(i)
-        # add knowledge to the knowledge base
-        self.knowledge.append(sent_new)
-        # 4 mark (save of mines) additional sells
-        # add new sets 
-        new_safe = set()
-        new_mines = set()
-        # iterate over sentence, mined and safe cells 
-        for centence in self.knowledge:
-            for cell in centence.known_mines():
-                new_mines.add(cell)
-            for cell in centence.known_safes():
-                new_safe.add(cell)
-        # mark them save / mines
-        for cell in new_safe:
-            self.mark_safe(cell)
-        for cell in new_mines:
-            self.mark_mine(cell)
-        # 5 add new centences to the knowledge base if they can be infered from existing knowledge
-        new_centence = []
-        # loop over the combinations 
-        for A, B in combinations(self.knowledge, 2):
-            infer = A.inference(B)
-            if infer is not None and infer not in self.knowledge:
-                new_centence.append(infer)
-        # extennd knowledge
-        self.knowledge.extend(new_centence)
-        # remove empty sentence
-        for i in self.knowledge:
-            if i == Sentence(set(), 0):
-                self.knowledge.remove(i)
+        # 3 create new sentence with the unknown neighboring cells
+        cells = set()
+        for neighbor in self.neighboring_cell(cell):
+            if neighbor in self.mines:
+                count -= 1
+            elif neighbor not in self.safes:
+                cells.add(neighbor)
+        self.add_sentence(cells, count)
+        # 4 and 5 infer from every sentence that changed, until no
+        # sentence is left to revisit
+        self.infer()
+
+    def infer(self):
+        """
+        Works through the queue of changed sentences: marks the cells of
+        settled sentences as safe or mines, and adds the differences
+        between each sentence and the sentences overlapping it.
+        """
+        while self.pending:
+            sentence_id = self.pending.popleft()
+            sentence = self.sentences.get(sentence_id)
+            if sentence is None:
+                continue
+
+            # Sentences with nothing left to say are dropped
+            if not sentence.cells:
+                self.remove_sentence(sentence_id)
+                continue
+
+            # Mark safe or mines cells of settled sentences
+            mines = sentence.known_mines()
+            safes = sentence.known_safes()
+            if mines or safes:
+                self.remove_sentence(sentence_id)
+                for cell in set(mines):
+                    self.mark_mine(cell)
+                for cell in set(safes):
+                    self.mark_safe(cell)
+                continue
+
+            # Compare with the sentences sharing a cell with this one
+            overlapping = set()
+            for cell in sentence.cells:
+                overlapping |= self.index.get(cell, set())
+            overlapping.discard(sentence_id)
+            for other_id in overlapping:
+                other = self.sentences[other_id]
+                infer = sentence.inference(other)
+                if infer is not None:
+                    self.add_sentence(infer.cells, infer.count)
 
     def neighboring_cell(self, cell):
         '''func to find all the neighboring cells
@@ -243,7 +341,7 @@ class MinesweeperAI():
                 if (i, j) == cell:
                     continue
                 # add neightbor
-                if 0 <= i < self.width and 0 <= j < self.height:
+                if 0 <= i < self.height and 0 <= j < self.width:
                     neighbors.add((i, j))
         return neighbors
 
@@ -255,12 +353,7 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        move_left = list(self.safes - self.moves_made)
-        # check it if it is None
-        if len(move_left) == 0:
-            return None
-        else:
-            return move_left[randrange(len(move_left))]
+        return bitboard.random_cell(self.safe_moves, self.width)
 
     def make_random_move(self):
         """
@@ -268,11 +361,40 @@ class MinesweeperAI():
         Should choose randomly among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+        When the number of mines is known, only the cells with the
+        lowest probability of being a mine are considered.
         """
-        moves_left = set(product(range(0, self.width), range(0, self.height)))
-        moves_left = moves_left - self.mines - self.moves_made
+        moves_left = self.unknown | self.safe_moves
+        if self.mine_count is not None and moves_left:
+            moves_left = self.safest_cells()
+        return bitboard.random_cell(moves_left, self.width)
 
-        if moves_left:
-            return choice(tuple(moves_left))
-        else:
-            return None
\ No newline at end of file
+    def safest_cells(self):
+        """
+        Returns the bitmask of the cells not yet chosen that are least
+        likely to be mines, weighing every placement of the remaining
+        mines consistent with the knowledge base equally.
+        """
+        if self.safe_moves:
+            return self.safe_moves
+        probabilities, other = mine_probabilities(
+            self.knowledge, self.unknown.bit_count(),
+            self.mine_count - len(self.mines)
+        )
+        if not probabilities and other is None:
+            return self.unknown
+
+        # Cells no sentence mentions all share the same probability
+        lowest = min(probabilities.values(), default=1)
+        interior = self.unknown & ~bitboard.from_cells(
+            probabilities, self.width
+        )
+        if other is not None and other < lowest:
+            return interior
+        cells = bitboard.from_cells((
+            cell for cell, probability in probabilities.items()
+            if probability == lowest
+        ), self.width)
+        if other is not None and other == lowest:
+            cells |= interior
+        return cells
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""
+Exact mine probabilities for the unknown cells of a Minesweeper board.
+
+The cells mentioned by the AI's sentences form the frontier. Sentences
+that share no cell constrain independent components, and each component
+is enumerated on its own, so the cost grows with the largest component
+rather than with the whole frontier. Components are then combined with
+the cells no sentence mentions through the total number of mines left.
+"""
+import sys
+from math import comb
+
+
+def components(knowledge):
+    """
+    Splits the sentences in `knowledge` into groups linked by shared
+    cells. Returns a list of (cells, sentences) pairs, where `cells` is
+    the set of cells mentioned by the group's `sentences`.
+    """
+    sentences = [sentence for sentence in knowledge if sentence.cells]
+
+    # Union-find over sentences, joined through the cells they share
+    parent = list(range(len(sentences)))
+
+    def find(k):
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    owner = {}
+    for k, sentence in enumerate(sentences):
+        for cell in sentence.cells:
+            if cell in owner:
+                parent[find(k)] = find(owner[cell])
+            else:
+                owner[cell] = k
+
+    groups = {}
+    for k, sentence in enumerate(sentences):
+        cells, members = groups.setdefault(find(k), (set(), []))
+        cells |= sentence.cells
+        members.append(sentence)
+    return list(groups.values())
+
+
+def solve_component(cells, sentences):
+    """
+    Counts the mine placements over `cells` consistent with every
+    sentence in `sentences`.
+
+    Returns a dict mapping each possible number of mines to a pair
+    (ways, mines), where `ways` is the number of placements with that
+    many mines and `mines` maps each cell to how many of those
+    placements put a mine on it.
+    """
+    order = search_order(cells, sentences)
+    position = {cell: k for k, cell in enumerate(order)}
+    n = len(order)
+
+    # Constraints as [mines still needed, cells still unassigned]
+    constraints = [[s.count, len(s.cells)] for s in sentences]
+    touching = [[] for _ in range(n)]
+    first = [n] * len(sentences)
+    last = [-1] * len(sentences)
+    for c, sentence in enumerate(sentences):
+        for cell in sentence.cells:
+            k = position[cell]
+            touching[k].append(constraints[c])
+            first[c] = min(first[c], k)
+            last[c] = max(last[c], k)
+
+    # Only constraints split by the cut before cell k shape what is
+    # left to place, so their counts identify equivalent subproblems
+    crossing = [
+        [constraints[c] for c in range(len(sentences))
+         if first[c] < k <= last[c]]
+        for k in range(n + 1)
+    ]
+    memo = {}
+
+    def place(k):
+        """
+        Returns {mines: [ways, per-cell mine counts]} for cells k onwards,
+        with per-cell counts listed in search order.
+        """
+        if k == n:
+            return {0: [1, []]}
+        key = (k, tuple(constraint[0] for constraint in crossing[k]))
+        if key in memo:
+            return memo[key]
+
+        result = {}
+        for mine in (0, 1):
+            consistent = True
+            for constraint in touching[k]:
+                constraint[0] -= mine
+                constraint[1] -= 1
+                if not 0 <= constraint[0] <= constraint[1]:
+                    consistent = False
+            if consistent:
+                for mines, (ways, counts) in place(k + 1).items():
+                    entry = result.get(mines + mine)
+                    if entry is None:
+                        entry = result[mines + mine] = [0, [0] * (n - k)]
+                    entry[0] += ways
+                    total = entry[1]
+                    total[0] += ways * mine
+                    for i, count in enumerate(counts, 1):
+                        total[i] += count
+            for constraint in touching[k]:
+                constraint[0] += mine
+                constraint[1] += 1
+
+        memo[key] = result
+        return result
+
+    # Every cell adds a frame, and large components are long chains
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, n + 100))
+    try:
+        placements = place(0)
+    finally:
+        sys.setrecursionlimit(limit)
+
+    return {
+        mines: (ways, dict(zip(order, counts)))
+        for mines, (ways, counts) in placements.items()
+    }
+
+
+def search_order(cells, sentences):
+    """
+    Orders `cells` breadth-first through the sentences linking them, so
+    each sentence is decided soon after its first cell is placed.
+    """
+    linked = {cell: [] for cell in cells}
+    for sentence in sentences:
+        for cell in sentence.cells:
+            linked[cell].append(sentence)
+
+    order = []
+    seen = set()
+    for start in sorted(cells):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = [start]
+        for cell in queue:
+            order.append(cell)
+            for sentence in linked[cell]:
+                for neighbor in sorted(sentence.cells - seen):
+                    seen.add(neighbor)
+                    queue.append(neighbor)
+    return order
+
+
+def convolve(left, right):
+    """
+    Returns the distribution of the sum of two independent mine counts,
+    each given as a dict from count to number of ways.
+    """
+    result = {}
+    for a, x in left.items():
+        for b, y in right.items():
+            result[a + b] = result.get(a + b, 0) + x * y
+    return result
+
+
+def mine_probabilities(knowledge, unknown, remaining):
+    """
+    Returns the probability that each unknown cell is a mine, given the
+    sentences in `knowledge`, the number of `unknown` cells on the board
+    and the number of mines `remaining` among them.
+
+    Returns a pair (probabilities, other), where `probabilities` maps
+    every cell mentioned in `knowledge` to its probability and `other`
+    is the probability shared by every unknown cell no sentence
+    mentions (None if there are none).
+    Every consistent placement of all remaining mines is equally likely.
+    """
+    groups = components(knowledge)
+    solved = [solve_component(cells, sentences) for cells, sentences in groups]
+    interior = unknown - sum(len(cells) for cells, _ in groups)
+
+    def weight(mines):
+        """Ways to place the other mines away from the frontier."""
+        if not 0 <= remaining - mines <= interior:
+            return 0
+        return comb(interior, remaining - mines)
+
+    # Mine count distributions of the components before and after each
+    ways = [
+        {mines: w for mines, (w, _) in placements.items()}
+        for placements in solved
+    ]
+    before = [{0: 1}]
+    for distribution in ways:
+        before.append(convolve(before[-1], distribution))
+    after = [{0: 1}]
+    for distribution in reversed(ways):
+        after.append(convolve(after[-1], distribution))
+    after.reverse()
+
+    total = sum(w * weight(mines) for mines, w in before[-1].items())
+    if not total:
+        return {}, None
+
+    probabilities = {}
+    for k, placements in enumerate(solved):
+        others = convolve(before[k], after[k + 1])
+        for mines, (_, counts) in placements.items():
+            factor = sum(w * weight(mines + m) for m, w in others.items())
+            for cell, count in counts.items():
+                probabilities[cell] = (probabilities.get(cell, 0)
+                                       + count * factor)
+    for cell in probabilities:
+        probabilities[cell] /= total
+
+    other = None
+    if interior > 0:
+        other = sum(
+            w * comb(interior - 1, remaining - mines - 1)
+            for mines, w in before[-1].items()
+            if 0 < remaining - mines <= interior
+        ) / total
+    return probabilities, other
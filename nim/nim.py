@@ -26,11 +26,32 @@ class Nim():
         Action `(i, j)` represents the action of removing `j` items
         from pile `i` (where piles are 0-indexed).
         """
-        actions = set()
+        return set(cls.actions(piles))
+
+    @classmethod
+    def actions(cls, piles):
+        """
+        Nim.actions(piles) yields the available actions `(i, j)` in
+        `piles` one at a time, pile by pile, without building them all.
+        """
         for i, pile in enumerate(piles):
             for j in range(1, pile + 1):
-                actions.add((i, j))
-        return actions
+                yield (i, j)
+
+    @classmethod
+    def random_action(cls, piles):
+        """
+        Nim.random_action(piles) returns an available action chosen
+        uniformly at random, or None if there is none.
+        """
+        remaining = sum(piles)
+        if not remaining:
+            return None
+        k = random.randrange(remaining)
+        for i, pile in enumerate(piles):
+            if k < pile:
+                return (i, k + 1)
+            k -= pile
 
     @classmethod
     def other_player(cls, player):
@@ -134,13 +155,13 @@ class NimAI():
         `state`, return 0.
         """
         best = 0
-        states = Nim.available_actions(state)
-        
-        for action in states:
-            if self.get_q_value(state, action) > best:
-                best = self.get_q_value(state, action)
-                
-        return best 
+
+        for action in Nim.actions(state):
+            value = self.get_q_value(state, action)
+            if value > best:
+                best = value
+
+        return best
             
     def choose_action(self, state, epsilon=True):
         """
@@ -158,18 +179,18 @@ class NimAI():
         options is an acceptable return value.
         """
         best = -math.inf
-        actions = Nim.available_actions(state)
 
         # eplsilon True
         if epsilon and random.random() <= self.epsilon:
-            return random.sample(actions, 1)[0]
+            return Nim.random_action(state)
 
         # eplsilon false
-        for action in actions:
-            if self.get_q_value(state, action) > best:
-                best = self.get_q_value(state, action)
+        for action in Nim.actions(state):
+            value = self.get_q_value(state, action)
+            if value > best:
+                best = value
                 best_action = action
-                
+
         return best_action
 
 def train(n):
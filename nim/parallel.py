@@ -0,0 +1,215 @@
+"""
+Parallel Q-learning self-play for Nim.
+
+Worker processes play batches of games with a snapshot of the Q-values,
+recording every update the games call for instead of applying it. Each
+round's snapshot is written once to a temporary file that every worker
+memory-maps read-only, so the table is never copied per batch. The
+learner applies the recorded updates to its own table, with its current
+values, in the order the batches were handed out.
+
+Batches are handed out in rounds of `workers` batches. A round plays
+with the values learnt from every round up to `staleness` rounds
+before it: with staleness 0 every round waits for the previous one to
+be learnt, with more the workers keep playing while the learner
+catches up. Batch k is seeded from `seed` and k alone, so the trained
+AI depends neither on the number of processes nor on timing.
+"""
+import mmap
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from collections import deque
+
+from nim import NimAI
+from table import QTable, state_space
+from trainer import MoveLists
+
+# Games per batch and batches per round when not given
+BATCH = 500
+WORKERS = 4
+
+# State space and action lists a worker has played, by initial piles
+# and symmetry
+spaces = {}
+
+
+def main():
+    if len(sys.argv) > 5:
+        sys.exit("Usage: python parallel.py "
+                 "[games] [processes] [staleness] [seed]")
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    staleness = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+    stats = {}
+    train(games, seed=seed, processes=processes, staleness=staleness,
+          stats=stats)
+    print(f"{stats['games']} games, {stats['updates']} updates "
+          f"in {stats['seconds']:.3f} s "
+          f"({stats['learning']:.3f} s learning)")
+    print(f"{stats['games_per_second']:.0f} games/s, "
+          f"{stats['updates_per_second']:.0f} updates/s")
+
+
+def train(n, initial=(1, 3, 5, 7), alpha=0.5, epsilon=0.1, seed=0,
+          processes=None, batch=BATCH, workers=WORKERS, staleness=0,
+          symmetric=False, stats=None):
+    """
+    Trains an AI by playing `n` games against itself in batches of
+    `batch` games spread over a pool of `processes` (all cores if None,
+    no pool if 1), and returns a `NimAI` whose `q` is a `QTable`.
+    If `symmetric`, piles are treated as unordered (see `CanonicalSpace`).
+
+    If `stats` is a dict, the games played, updates applied, wall and
+    learning seconds, games per second and updates per second are
+    stored in it.
+    """
+    space = state_space(initial, symmetric)
+    table = QTable(space)
+    moves = MoveLists(space)
+    sizes = [min(batch, n - start) for start in range(0, n, batch)]
+    rounds = [
+        [(space.initial, symmetric, size, epsilon, f"{seed}:{k}")
+         for k, size in enumerate(sizes[first:first + workers], first)]
+        for first in range(0, len(sizes), workers)
+    ]
+
+    updates = 0
+    learning = 0.0
+    start = time.perf_counter()
+    directory = tempfile.mkdtemp(prefix="nim-")
+    pool = multiprocessing.Pool(processes) if processes != 1 else None
+    try:
+        pending = deque()
+        for number in range(len(rounds) + staleness + 1):
+
+            # Hand out the next round with the values learnt so far
+            if number < len(rounds):
+                snapshot = os.path.join(directory, f"round-{number}.q")
+                with open(snapshot, "wb") as f:
+                    f.write(memoryview(table.values).cast("B"))
+                tasks = [(snapshot,) + task for task in rounds[number]]
+                if pool is None:
+                    results = [play_batch(*task) for task in tasks]
+                else:
+                    results = pool.starmap_async(play_batch, tasks)
+                pending.append((snapshot, results))
+
+            # Learn from the oldest round once `staleness` newer ones
+            # are being played, or once every round has been handed out
+            if len(pending) > staleness or number >= len(rounds):
+                if not pending:
+                    continue
+                snapshot, results = pending.popleft()
+                if pool is not None:
+                    results = results.get()
+                os.remove(snapshot)
+                before = time.perf_counter()
+                for transitions in results:
+                    updates += learn(table.values, moves, transitions, alpha)
+                learning += time.perf_counter() - before
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        shutil.rmtree(directory, ignore_errors=True)
+    seconds = time.perf_counter() - start
+    table.games += n
+
+    if stats is not None:
+        stats.update({
+            "games": n,
+            "updates": updates,
+            "seconds": seconds,
+            "learning": learning,
+            "games_per_second": n / seconds if seconds else 0.0,
+            "updates_per_second": updates / seconds if seconds else 0.0
+        })
+
+    player = NimAI(alpha=alpha, epsilon=epsilon)
+    player.q = table
+    return player
+
+
+def play_batch(snapshot, initial, symmetric, n, epsilon, seed):
+    """
+    Plays `n` games from `initial` piles choosing actions with the
+    Q-values stored in the file `snapshot`, and returns the updates they
+    call for as arrays of Q-value indices, next states and rewards.
+    """
+    if (initial, symmetric) not in spaces:
+        space = state_space(initial, symmetric)
+        spaces[initial, symmetric] = (space, MoveLists(space))
+    space, moves = spaces[initial, symmetric]
+    with open(snapshot, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    q = memoryview(mapped).cast("d")
+    rng = random.Random(seed)
+    start = space.encode(initial)
+
+    indices = array("l")
+    states = array("l")
+    rewards = array("b")
+
+    def record(index, state, reward):
+        indices.append(index)
+        states.append(state)
+        rewards.append(reward)
+
+    for _ in range(n):
+        state = start
+        last = [None, None]
+        player = 0
+
+        while True:
+            options, nexts = moves[state]
+            if rng.random() <= epsilon:
+                choice = rng.randrange(len(options))
+            else:
+                best = None
+                for k, candidate in enumerate(options):
+                    if best is None or q[candidate] > best:
+                        best = q[candidate]
+                        choice = k
+            index, after = options[choice], nexts[choice]
+
+            last[player] = index
+            player = 1 - player
+
+            if not moves[after][0]:
+                record(index, after, -1)
+                if last[player] is not None:
+                    record(last[player], after, 1)
+                break
+
+            if last[player] is not None:
+                record(last[player], after, 0)
+            state = after
+
+    return indices, states, rewards
+
+
+def learn(q, moves, transitions, alpha):
+    """
+    Applies recorded updates to the Q-values `q`, estimating future
+    rewards with the current values. Returns the number of updates.
+    """
+    indices, states, rewards = transitions
+    for index, state, reward in zip(indices, states, rewards):
+        best = 0
+        for other in moves[state][0]:
+            if q[other] > best:
+                best = q[other]
+        q[index] += alpha * ((reward + best) - q[index])
+    return len(indices)
+
+
+if __name__ == "__main__":
+    main()
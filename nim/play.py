@@ -1,4 +1,13 @@
-from nim import train, play
+from nim import play
+from store import load, save
+from trainer import train
 
-ai = train(10000)
+# Trained AI, reused by every later game
+TABLE = "nim.qtable"
+
+try:
+    ai = load(TABLE)
+except (OSError, ValueError):
+    ai = train(10000)
+    save(ai, TABLE)
 play(ai)
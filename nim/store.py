@@ -0,0 +1,116 @@
+"""
+Binary files holding a trained NimAI.
+
+A file starts with MAGIC, the format version and the length of a JSON
+header holding the AI's settings and the table layout, padded so the
+values that follow are 8-byte aligned. The values are the float64
+contents of the `QTable`, in the byte order named in the header, so a
+file can be memory-mapped and read in place by any number of processes.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from nim import NimAI
+from table import QTable, state_space
+
+MAGIC = b"NIMQ"
+
+# Bump whenever the layout of the file changes
+TABLE_VERSION = 1
+
+# Magic, version and header length
+PREFIX = struct.Struct("<4sHI")
+
+
+def save(ai, path):
+    """
+    Writes `ai`, whose `q` must be a `QTable`, to the file at `path`.
+    The file is replaced atomically, so readers never see it half written.
+    """
+    table = ai.q
+    header = json.dumps({
+        "alpha": ai.alpha,
+        "epsilon": ai.epsilon,
+        "games": table.games,
+        "initial": list(table.space.initial),
+        "symmetric": table.space.symmetric,
+        "byteorder": sys.byteorder,
+        "count": len(table.values)
+    }).encode("utf-8")
+    header += b" " * (-(PREFIX.size + len(header)) % 8)
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(PREFIX.pack(MAGIC, TABLE_VERSION, len(header)))
+            f.write(header)
+            f.write(memoryview(table.values).cast("B"))
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def read_header(f):
+    """
+    Reads the prefix and header of an open table file.
+    Returns the header and the offset of the values.
+    Raises ValueError if the file is not a table of this version.
+    """
+    prefix = f.read(PREFIX.size)
+    if len(prefix) != PREFIX.size:
+        raise ValueError("not a Nim Q-table file")
+    magic, version, length = PREFIX.unpack(prefix)
+    if magic != MAGIC:
+        raise ValueError("not a Nim Q-table file")
+    if version != TABLE_VERSION:
+        raise ValueError(f"Q-table file version {version}, "
+                         f"expected {TABLE_VERSION}")
+    header = json.loads(f.read(length))
+    return header, PREFIX.size + length
+
+
+def load(path, writable=False):
+    """
+    Returns the NimAI stored in the file at `path`.
+
+    By default the values are memory-mapped read-only: loading is
+    instant, processes loading the same file share its pages, and
+    training the AI further raises TypeError. With `writable`, the
+    values are copied into memory instead.
+    Raises ValueError if the file is not a table of this version.
+    """
+    with open(path, "rb") as f:
+        header, offset = read_header(f)
+        space = state_space(header["initial"],
+                            header.get("symmetric", False))
+        count = header["count"]
+        if count != space.count:
+            raise ValueError("Q-table size does not match its piles")
+
+        if writable or header["byteorder"] != sys.byteorder:
+            values = array("d")
+            values.frombytes(f.read(8 * count))
+            if header["byteorder"] != sys.byteorder:
+                values.byteswap()
+        elif count:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            values = memoryview(mapped)[offset:offset + 8 * count]
+            if len(values) != 8 * count:
+                raise ValueError("Q-table file is truncated")
+            values = values.cast("d")
+        else:
+            values = array("d")
+        if len(values) != count:
+            raise ValueError("Q-table file is truncated")
+
+    ai = NimAI(alpha=header["alpha"], epsilon=header["epsilon"])
+    ai.q = QTable(space, values, header["games"])
+    return ai
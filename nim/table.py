@@ -0,0 +1,334 @@
+"""
+Dense Q-tables for Nim.
+
+Every pile configuration reachable from the initial piles is numbered,
+and every action available in it gets a position in one flat array of
+floats. Two numberings are available:
+
+- `StateSpace` numbers piles as a mixed-radix integer and gives every
+  state a row with a slot for every action of the initial piles.
+- `CanonicalSpace` treats piles as unordered: only sorted piles are
+  numbered, actions on piles of equal size share one value, and each
+  state stores only the actions available in it. For k piles this
+  shrinks the table by up to k! times.
+"""
+from array import array
+from bisect import bisect_right
+from collections.abc import MutableMapping
+
+from nim import Nim
+
+# Largest Q-table, in bytes, a state space may ask for
+MAX_TABLE_BYTES = 256 * 1024 * 1024
+
+
+def check_budget(initial, count):
+    """
+    Raises ValueError if `count` Q-values exceed MAX_TABLE_BYTES.
+    """
+    if count * 8 > MAX_TABLE_BYTES:
+        raise ValueError(
+            f"Q-table for piles {list(initial)} needs {count * 8} bytes, "
+            f"more than the limit of {MAX_TABLE_BYTES}"
+        )
+
+
+class StateSpace():
+    """
+    The pile configurations reachable from `initial`.
+
+    Pile i is a digit in base `initial[i] + 1`, with the last pile least
+    significant. Action (i, j), removing j items from pile i, has slot
+    `offsets[i] + j - 1`, so there are `sum(initial)` slots in a row and
+    the value for action `slot` in state `state` is at
+    `state * width + slot`.
+    """
+    symmetric = False
+
+    def __init__(self, initial):
+        self.initial = tuple(initial)
+        self.weights = []
+        self.size = 1
+        for pile in reversed(self.initial):
+            self.weights.append(self.size)
+            self.size *= pile + 1
+        self.weights.reverse()
+
+        self.offsets = []
+        self.width = 0
+        for pile in self.initial:
+            self.offsets.append(self.width)
+            self.width += pile
+        self.count = self.size * self.width
+        check_budget(self.initial, self.count)
+
+    def encode(self, piles):
+        """
+        Returns the number of the state with `piles`.
+        Raises ValueError if it is not reachable from the initial piles.
+        """
+        if len(piles) != len(self.initial) or not all(
+            0 <= pile <= limit for pile, limit in zip(piles, self.initial)
+        ):
+            raise ValueError(f"piles {list(piles)} are not reachable "
+                             f"from {list(self.initial)}")
+        return sum(pile * weight for pile, weight in zip(piles, self.weights))
+
+    def decode(self, state):
+        """
+        Returns the piles of state number `state`, as a tuple.
+        """
+        piles = []
+        for weight in self.weights:
+            pile, state = divmod(state, weight)
+            piles.append(pile)
+        return tuple(piles)
+
+    def index(self, piles, action):
+        """
+        Returns the position of the value of `action` in `piles`.
+        Raises ValueError if the action is not available there.
+        """
+        state = self.encode(piles)
+        i, j = check_action(piles, action)
+        return state * self.width + self.offsets[i] + j - 1
+
+    def actions(self, state):
+        """
+        Returns the (value position, next state) pairs for every action
+        available in state number `state`.
+        """
+        moves = []
+        row = state * self.width
+        for i, pile in enumerate(self.decode(state)):
+            for j in range(1, pile + 1):
+                moves.append((row + self.offsets[i] + j - 1,
+                              state - j * self.weights[i]))
+        return moves
+
+
+class CanonicalSpace():
+    """
+    The pile configurations reachable from `initial`, up to the order
+    of the piles.
+
+    States are the sorted pile tuples, numbered in lexicographic order.
+    A sorted tuple is reachable if each pile is at most the pile at the
+    same position in the sorted initial piles. The values of a state are
+    stored together, one per distinct pile size and number of items to
+    remove, after the values of every state numbered before it.
+
+    States are numbered and listed arithmetically from counts of sorted
+    tuples (see `canonical_tables`), so the space itself takes memory
+    proportional to the number and size of the piles, not of the states.
+    """
+    symmetric = True
+
+    def __init__(self, initial):
+        self.initial = tuple(initial)
+        self.limits = sorted(self.initial)
+        self.tables = canonical_tables(self.limits)
+        self.size, self.count = 1, 0
+        if self.tables:
+            sequences, values, weighted = self.tables[0]
+            self.size = sequences[-1]
+            self.count = values[-1] + weighted[-1]
+        check_budget(self.initial, self.count)
+
+    def encode(self, piles):
+        """
+        Returns the number of the state with `piles`, in any order.
+        Raises ValueError if it is not reachable from the initial piles.
+        """
+        return self.locate(piles)[0]
+
+    def locate(self, piles):
+        """
+        Returns the number of the state with `piles`, in any order, and
+        the position of its first value.
+        Raises ValueError if it is not reachable from the initial piles.
+        """
+        piles = sorted(piles)
+        if len(piles) != len(self.limits) or not all(
+            0 <= pile <= limit for pile, limit in zip(piles, self.limits)
+        ):
+            raise ValueError(f"piles {list(piles)} are not reachable "
+                             f"from {list(self.initial)}")
+
+        # Count the states, and their values, that agree with `piles`
+        # up to some position and have a smaller pile there. Those with
+        # the same pile there as before it get no values for it.
+        state = offset = distinct = previous = 0
+        for (sequences, values, weighted), pile in zip(self.tables, piles):
+            smaller = sequences[pile] - sequences[previous]
+            state += smaller
+            offset += (values[pile] - values[previous]
+                       + distinct * smaller
+                       + weighted[pile] - weighted[previous])
+            if pile != previous:
+                offset -= previous * (sequences[previous + 1]
+                                      - sequences[previous])
+                distinct += pile
+            previous = pile
+        return state, offset
+
+    def decode(self, state):
+        """
+        Returns the sorted piles of state number `state`, as a tuple.
+        """
+        if not 0 <= state < self.size:
+            raise IndexError(f"no state number {state}")
+        piles = []
+        previous = 0
+        for (sequences, _, _), limit in zip(self.tables, self.limits):
+            # The largest pile whose smaller piles come before `state`
+            pile = bisect_right(sequences, state + sequences[previous]) - 1
+            pile = min(pile, limit)
+            state -= sequences[pile] - sequences[previous]
+            piles.append(pile)
+            previous = pile
+        return tuple(piles)
+
+    def index(self, piles, action):
+        """
+        Returns the position of the value of `action` in `piles`, which
+        is shared with removing as many items from any equal pile.
+        Raises ValueError if the action is not available there.
+        """
+        _, offset = self.locate(piles)
+        i, j = check_action(piles, action)
+        smaller = sum({pile for pile in piles if pile < piles[i]})
+        return offset + smaller + j - 1
+
+    def actions(self, state):
+        """
+        Returns the (value position, next state) pairs for every distinct
+        action available in state number `state`.
+        """
+        moves = []
+        piles = self.decode(state)
+        _, index = self.locate(piles)
+        for position, pile in enumerate(piles):
+            if position and piles[position - 1] == pile:
+                continue
+            rest = piles[:position] + piles[position + 1:]
+            for j in range(1, pile + 1):
+                moves.append((index, self.encode(rest + (pile - j,))))
+                index += 1
+        return moves
+
+
+def check_action(piles, action):
+    """
+    Returns `action` as (i, j), raising ValueError unless it removes
+    at least one and at most all items of an existing pile.
+    """
+    i, j = action
+    if not 0 <= i < len(piles) or not 1 <= j <= piles[i]:
+        raise ValueError(f"action {action} is not available "
+                         f"in piles {list(piles)}")
+    return i, j
+
+
+def canonical_tables(limits):
+    """
+    Returns, for each position p of sorted `limits`, three lists of
+    prefix sums over the pile at p, indexed by x from 0 to
+    `limits[p] + 1`, over the ways to fill p and the positions after it
+    with a pile below x at p:
+
+    - `sequences[x]`: the number of such ways,
+    - `values[x]`: the values the piles after p add in them,
+    - `weighted[x]`: the sum of the pile at p over them.
+
+    A pile adds as many values as its size unless it equals the pile
+    before it, so these count the states and values of `CanonicalSpace`.
+    """
+    tables = []
+
+    # Completions after the current position, and the values they add,
+    # by the pile at the current position
+    after = [1] * (limits[-1] + 1) if limits else []
+    added = [0] * len(after)
+    for p in reversed(range(len(limits))):
+        sequences, values, weighted = [0], [0], [0]
+        for x in range(limits[p] + 1):
+            sequences.append(sequences[-1] + after[x])
+            values.append(values[-1] + added[x])
+            weighted.append(weighted[-1] + x * after[x])
+        tables.append((sequences, values, weighted))
+
+        # Sum over the next pile y >= x, which adds y values unless y == x
+        if p:
+            total = extra = 0
+            completions = [0] * (limits[p - 1] + 1)
+            sums = [0] * len(completions)
+            for x in reversed(range(limits[p] + 1)):
+                total += after[x]
+                extra += added[x] + x * after[x]
+                if x < len(completions):
+                    completions[x] = total
+                    sums[x] = extra - x * after[x]
+            after, added = completions, sums
+
+    tables.reverse()
+    return tables
+
+
+def state_space(initial, symmetric=False):
+    """
+    Returns the canonical space for `initial` if `symmetric`, otherwise
+    the mixed-radix one.
+    """
+    return CanonicalSpace(initial) if symmetric else StateSpace(initial)
+
+
+class QTable(MutableMapping):
+    """
+    Q-values for every (state, action) pair of a state space, stored in
+    a flat array of floats.
+
+    Works as a drop-in `NimAI.q`: keys are `(tuple(piles), (i, j))`
+    pairs, every available action has a value (0 until updated) and
+    deleting a value resets it to 0. `values` may be any sequence of
+    floats, such as a read-only view of a memory-mapped file.
+    `games` counts the training games the values were learnt from.
+    """
+
+    def __init__(self, space, values=None, games=0):
+        self.space = space
+        if values is None:
+            values = array("d", [0.0]) * space.count
+        self.values = values
+        self.games = games
+
+    def index(self, key):
+        """
+        Returns the position of the value for `key` in `values`.
+        Raises KeyError if the action is not available in the state.
+        """
+        try:
+            piles, action = key
+            return self.space.index(piles, action)
+        except (TypeError, ValueError):
+            raise KeyError(key) from None
+
+    def __getitem__(self, key):
+        return self.values[self.index(key)]
+
+    def __setitem__(self, key, value):
+        self.values[self.index(key)] = value
+
+    def __delitem__(self, key):
+        self.values[self.index(key)] = 0.0
+
+    def __iter__(self):
+        for state in range(self.space.size):
+            piles = self.space.decode(state)
+            for action in Nim.actions(piles):
+                yield (piles, action)
+
+    def __len__(self):
+        # Each state has as many actions as it has items left
+        return sum(sum(self.space.decode(state))
+                   for state in range(self.space.size))
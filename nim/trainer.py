@@ -0,0 +1,123 @@
+"""
+Fast Q-learning self-play for Nim.
+
+Plays the same games and applies the same updates as `nim.train`, but
+over a dense `QTable`: states are integers, the actions of a state
+are listed once, the first time it is reached, and no sets or tuples
+are built per move.
+"""
+import random
+import sys
+from array import array
+
+from nim import NimAI
+from table import MAX_TABLE_BYTES, QTable, state_space
+
+# Most bytes of listed actions kept at once; states reached after that
+# have their actions listed again on every visit
+MAX_LISTED_BYTES = MAX_TABLE_BYTES
+
+
+def train(n, initial=(1, 3, 5, 7), alpha=0.5, epsilon=0.1, seed=None,
+          symmetric=False):
+    """
+    Trains an AI by playing `n` games against itself starting from
+    `initial` piles, and returns a `NimAI` whose `q` is a `QTable`.
+    The same `seed` always gives the same AI.
+    If `symmetric`, piles are treated as unordered (see `CanonicalSpace`),
+    which makes the table smaller and training faster for many piles.
+    """
+    space = state_space(initial, symmetric)
+    table = QTable(space)
+    play_games(table, n, alpha, epsilon, random.Random(seed))
+
+    player = NimAI(alpha=alpha, epsilon=epsilon)
+    player.q = table
+    return player
+
+
+class MoveLists():
+    """
+    The actions available in each state of `space`, listed when first
+    asked for as two arrays: their Q-value indices and next states.
+
+    At most `limit` bytes of lists are kept, so memory stays bounded
+    however large the space is.
+    """
+
+    def __init__(self, space, limit=MAX_LISTED_BYTES):
+        self.space = space
+        self.lists = [None] * space.size
+        self.listed = sys.getsizeof(self.lists)
+        self.limit = limit
+
+    def __getitem__(self, state):
+        moves = self.lists[state]
+        if moves is None:
+            pairs = self.space.actions(state)
+            moves = (array("l", [index for index, _ in pairs]),
+                     array("l", [after for _, after in pairs]))
+            size = sum(map(sys.getsizeof, moves)) + sys.getsizeof(moves)
+            if self.listed + size <= self.limit:
+                self.lists[state] = moves
+                self.listed += size
+        return moves
+
+
+def play_games(table, n, alpha, epsilon, rng):
+    """
+    Plays `n` self-play games, updating the values of `table` in place.
+    """
+    table.games += n
+    space = table.space
+    q = table.values
+    moves = MoveLists(space)
+    start = space.encode(space.initial)
+
+    def future(state):
+        """Best Q-value in `state`, or 0 if none is higher."""
+        best = 0
+        for index in moves[state][0]:
+            if q[index] > best:
+                best = q[index]
+        return best
+
+    for _ in range(n):
+        state = start
+
+        # Index of the last Q-value chosen by each player
+        last = [None, None]
+        player = 0
+
+        while True:
+
+            # Choose an action: random with probability epsilon,
+            # otherwise the first one with the highest Q-value
+            indices, nexts = moves[state]
+            if rng.random() <= epsilon:
+                choice = rng.randrange(len(indices))
+            else:
+                best = None
+                for k, candidate in enumerate(indices):
+                    if best is None or q[candidate] > best:
+                        best = q[candidate]
+                        choice = k
+            index, after = indices[choice], nexts[choice]
+
+            last[player] = index
+            player = 1 - player
+
+            # When game is over, update Q values with rewards: the
+            # player who took the last item loses
+            if not moves[after][0]:
+                q[index] += alpha * (-1 - q[index])
+                other = last[player]
+                if other is not None:
+                    q[other] += alpha * (1 - q[other])
+                break
+
+            # If game is continuing, no rewards yet
+            other = last[player]
+            if other is not None:
+                q[other] += alpha * (future(after) - q[other])
+            state = after